@@ -0,0 +1,209 @@
+"""
+Semantic answer cache for /api/ask.
+
+Answers are stored with the embedding of the question that produced them, the
+model that answered, the search scope (namespace and metadata filter, see
+RetrievalContext.scope_key) and the knowledge-base version (see
+DocumentManifestStore.get_version). A later question whose embedding is within
+ANSWER_CACHE_THRESHOLD cosine similarity of a cached one, asked of the same
+model in the same scope against the same knowledge-base version, gets the
+cached answer and sources without running the crew. Entries expire after ANSWER_CACHE_TTL_SECONDS
+and the least recently used are evicted beyond ANSWER_CACHE_MAX_ENTRIES. Any
+upload that changes the index bumps the version, which drops every entry.
+Callers do not cache answers that used web search or ask about current events.
+"""
+
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+
+class CachedAnswer(NamedTuple):
+    """A cached answer and the sources that were sent with it."""
+    answer: str
+    sources: List[Dict[str, Any]]
+    similarity: float
+
+
+class _Entry(NamedTuple):
+    embedding: np.ndarray
+    model: str
+    scope: str
+    answer: str
+    sources: List[Dict[str, Any]]
+    created_at: float
+
+
+class AnswerCache:
+    """In-memory TTL/LRU cache of answers keyed by question embedding."""
+
+    _instance: Optional['AnswerCache'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Initialize the cache with environment variables.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit (defaults to ANSWER_CACHE_THRESHOLD)
+            ttl_seconds: Entry lifetime (defaults to ANSWER_CACHE_TTL_SECONDS)
+            max_entries: Maximum entries before LRU eviction (defaults to ANSWER_CACHE_MAX_ENTRIES)
+        """
+        self.threshold = threshold or float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+        self.max_entries = max_entries or int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._kb_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def get_instance(cls) -> 'AnswerCache':
+        """Get singleton instance of AnswerCache."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get(
+        self,
+        embedding: List[float],
+        model: str,
+        kb_version: int,
+        scope: str = ""
+    ) -> Optional[CachedAnswer]:
+        """
+        Find the answer to the most similar cached question.
+
+        Args:
+            embedding: Embedding of the new question
+            model: Model that would answer it
+            kb_version: Current knowledge-base version
+            scope: Search scope of the question
+
+        Returns:
+            CachedAnswer on a hit, otherwise None
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            self._sync_version(kb_version)
+            self._expire()
+
+            keys = [
+                key for key, entry in self._entries.items()
+                if entry.model == model and entry.scope == scope
+            ]
+            if keys:
+                similarities = np.stack([self._entries[key].embedding for key in keys]) @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    key = keys[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    entry = self._entries[key]
+                    return CachedAnswer(entry.answer, entry.sources, float(similarities[best]))
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        embedding: List[float],
+        model: str,
+        kb_version: int,
+        answer: str,
+        sources: List[Dict[str, Any]],
+        scope: str = ""
+    ) -> None:
+        """
+        Cache an answer.
+
+        Args:
+            embedding: Embedding of the question
+            model: Model that answered
+            kb_version: Knowledge-base version the answer was produced against
+            answer: Full answer text
+            sources: Source metadata sent with the answer
+            scope: Search scope the answer was produced in
+        """
+        with self._lock:
+            self._sync_version(kb_version)
+            if kb_version != self._kb_version:
+                # The index changed while this answer was being generated
+                return
+            self._entries[uuid.uuid4().hex] = _Entry(
+                self._normalize(embedding), model, scope, answer, sources, time.time()
+            )
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the current number of entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    def _sync_version(self, kb_version: int) -> None:
+        """Drop every entry when the knowledge base has moved on (caller holds the lock)."""
+        if self._kb_version is None or kb_version > self._kb_version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._kb_version = kb_version
+
+    def _expire(self) -> None:
+        """Remove entries older than the TTL (caller holds the lock)."""
+        cutoff = time.time() - self.ttl_seconds
+        # Hits reorder entries, so the oldest ones are not necessarily at the front
+        expired = [key for key, entry in self._entries.items() if entry.created_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Unit-normalize an embedding so dot products are cosine similarities."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def answer_cache_enabled() -> bool:
+    """Whether /api/ask answers are cached (ANSWER_CACHE_ENABLED)."""
+    return os.getenv("ANSWER_CACHE_ENABLED", "true").lower() != "false"
+
+
+# Convenience function to get cache instance
+def get_answer_cache() -> AnswerCache:
+    """Get singleton instance of AnswerCache."""
+    return AnswerCache.get_instance()
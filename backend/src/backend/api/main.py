@@ -5,6 +5,7 @@ FastAPI application for NotStuck RAG chatbot.
 import os
 import sys
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -22,7 +23,7 @@ if sys.platform == "win32":
 load_dotenv()
 
 # Import routers
-from backend.api.routes import upload, ask, models
+from backend.api.routes import upload, ask, models, admin, documents
 
 # Create FastAPI app
 app = FastAPI(
@@ -44,24 +45,18 @@ app.add_middleware(
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(ask.router, prefix="/api", tags=["ask"])
 app.include_router(models.router, prefix="/api", tags=["models"])
+app.include_router(documents.router, prefix="/api", tags=["documents"])
+app.include_router(admin.router, prefix="/api", tags=["admin"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Reset Pinecone database on startup."""
-    print("🔄 Resetting Pinecone database on startup...")
-    try:
-        from backend.clients.pinecone_client import get_pinecone_client
+    """Start warming up in the background; the knowledge base is kept across restarts."""
+    import asyncio
+    from backend.lifecycle import warm_up
 
-        pinecone_client = get_pinecone_client()
-        index = pinecone_client.get_index()
-
-        # Delete all vectors in the index
-        index.delete(delete_all=True)
-
-        print("✅ Pinecone database reset complete")
-    except Exception as e:
-        print(f"⚠️ Warning: Could not reset Pinecone database: {e}")
+    # Keep a reference so the task is not garbage collected while it runs
+    app.state.warmup_task = asyncio.create_task(warm_up())
 
 
 @app.get("/")
@@ -76,8 +71,31 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint, with warm-up progress under readiness."""
+    from backend.answer_cache import get_answer_cache
+    from backend.clients.embedding_cache import get_embedding_cache
+    from backend.crew_pool import get_crew_pool
+    from backend.lifecycle import get_readiness
+    from backend.tools.web_cache import get_web_search_cache
+
+    readiness = get_readiness()
+    return {
+        "status": "healthy",
+        "ready": readiness.ready,
+        "readiness": readiness.snapshot(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "crew_pool": get_crew_pool().stats(),
+        "web_search_cache": get_web_search_cache().stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics endpoint (stage latencies, tokens, cache hits, errors)."""
+    from backend.metrics import get_metrics
+
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""
+Admin endpoints for knowledge base maintenance.
+"""
+
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+
+from backend.concurrency import get_executor
+from backend.lifecycle import reset_knowledge_base
+
+router = APIRouter()
+
+
+class ResetResponse(BaseModel):
+    """Response model for the reset endpoint."""
+    success: bool
+    message: str
+
+
+def _check_admin_token(token: Optional[str]) -> None:
+    """
+    Verify the X-Admin-Token header against ADMIN_TOKEN.
+
+    Raises:
+        HTTPException: 403 if ADMIN_TOKEN is not configured or the token does not match
+    """
+    expected = os.getenv("ADMIN_TOKEN", "")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not token or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/admin/reset", response_model=ResetResponse)
+async def reset(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Delete every document from the knowledge base.
+
+    Args:
+        x_admin_token: Must match the ADMIN_TOKEN environment variable
+
+    Returns:
+        ResetResponse once the vectors, manifests and caches are cleared
+    """
+    _check_admin_token(x_admin_token)
+
+    print("🔄 Resetting knowledge base...")
+    try:
+        await get_executor("search").run(reset_knowledge_base)
+    except Exception as e:
+        print(f"❌ Knowledge base reset failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Error resetting knowledge base: {e}")
+
+    print("✅ Knowledge base reset complete")
+    return ResetResponse(success=True, message="Knowledge base reset")
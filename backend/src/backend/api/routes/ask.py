@@ -2,23 +2,56 @@
 Ask endpoint for RAG-powered question answering using CrewAI.
 """
 
-import os
 import json
-from typing import List, Optional, AsyncGenerator
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, AsyncGenerator, AsyncIterator
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from backend.crew import Backend
-from backend.tools.pinecone_search import PineconeSearchTool
+from backend.answer_cache import answer_cache_enabled, get_answer_cache
+from backend.batch import answer_batch, get_batch_max_questions
+from backend.clients.openai_client import get_openai_client
+from backend.clients.vector_store import validate_namespace
+from backend.concurrency import get_executor
+from backend.api.routes.models import is_available_model
+from backend.crew_pool import get_default_model
+from backend.fast_path import (
+    ROUTE_AGENT, build_messages, classify_question, fast_path_enabled, needs_fresh_information
+)
+from backend.metrics import get_metrics
+from backend.tools.document_manifest import get_manifest_store
+from backend.tools.retrieval_context import build_metadata_filter, cite_results, retrieval_scope
+
+# Modules that import crewai (crew, streaming, the search tool) are imported inside
+# the handlers, so the app starts serving without waiting for crewai to load
 
 router = APIRouter()
 
 
+class SearchFilters(BaseModel):
+    """Metadata filters restricting the knowledge-base search."""
+    source_files: Optional[List[str]] = None
+    doc_types: Optional[List[str]] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+
+
 class AskRequest(BaseModel):
     """Request model for ask endpoint."""
     question: str
     modelName: Optional[str] = "openai/gpt-4o"
+    namespace: Optional[str] = None
+    filters: Optional[SearchFilters] = None
+
+
+class BatchAskRequest(BaseModel):
+    """Request model for batch ask endpoint."""
+    questions: List[str]
+    modelName: Optional[str] = "openai/gpt-4o"
+    namespace: Optional[str] = None
+    filters: Optional[SearchFilters] = None
 
 
 class SourceMetadata(BaseModel):
@@ -26,6 +59,8 @@ class SourceMetadata(BaseModel):
     source_file: str
     page_number: Optional[int] = None
     text: str
+    # Other documents containing a near-duplicate of the cited chunk
+    duplicate_sources: List[str] = []
 
 
 class AskResponse(BaseModel):
@@ -39,7 +74,9 @@ async def ask_question(request: AskRequest):
     """
     Answer a question using RAG pipeline with CrewAI (streaming).
 
-    The crew will:
+    Simple questions take a fast path of a single LLM call, either directly or
+    with the retrieved context (see backend.fast_path). Every knowledge-base
+    search is restricted to the request's namespace and filters. Otherwise the crew will:
     1. Analyze the question
     2. Search Pinecone for relevant context
     3. If context found, use it to answer
@@ -51,42 +88,83 @@ async def ask_question(request: AskRequest):
     Returns:
         Streaming response with answer chunks
     """
+    # The model is passed to the crew or LLM of this request only
+    model = _resolve_model(request.modelName)
+    namespace, metadata_filter = _search_scope(request.namespace, request.filters)
+    if get_executor("crew").is_saturated():
+        raise HTTPException(status_code=503, detail="Too many questions in progress, please retry shortly")
+
+    received_at = time.perf_counter()
+
     async def generate_stream() -> AsyncGenerator[str, None]:
-        try:
-            # Set the model via environment variable (CrewAI will use this)
-            if request.modelName:
-                os.environ["OPENAI_MODEL_NAME"] = request.modelName
+        from backend.crew import create_streaming_llm
+        from backend.streaming import stream_kickoff, stream_llm_call
+
+        # Share one embedding + vector query between the sources event and the crew;
+        # the ask span is the parent of every stage traced for this question
+        with retrieval_scope(namespace, metadata_filter) as scope, get_metrics().timed("ask"):
+            try:
+                kb_version = get_manifest_store().get_version()
+                embedding = await _embed_question(request.question)
+                if embedding is not None:
+                    scope.put_embedding(request.question, embedding)
+                use_answer_cache = embedding is not None and answer_cache_enabled()
 
-            # Get sources first
-            sources = await _extract_sources(request.question)
+                # Answer repeated or near-duplicate questions from the cache
+                if use_answer_cache:
+                    cached = get_answer_cache().get(embedding, model, kb_version, scope.scope_key)
+                    if cached is not None:
+                        get_metrics().ask_requests.inc(route="cache")
+                        yield f"data: {json.dumps({'type': 'sources', 'data': cached.sources})}\n\n"
+                        yield f"data: {json.dumps({'type': 'content', 'data': cached.answer})}\n\n"
+                        yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                        return
 
-            # Send sources first
-            yield f"data: {json.dumps({'type': 'sources', 'data': [s.model_dump() for s in sources]})}\n\n"
+                # Get sources first; the crew and the router reuse this search
+                search_results = await _search_knowledge_base(request.question)
+                sources = _extract_sources(search_results)
+                sources_data = [s.model_dump() for s in sources]
 
-            # Initialize the crew
-            backend_crew = Backend()
+                # Send sources first
+                yield f"data: {json.dumps({'type': 'sources', 'data': sources_data})}\n\n"
 
-            # Prepare inputs for the crew
-            inputs = {"question": request.question}
+                route = ROUTE_AGENT
+                if fast_path_enabled() and "error" not in search_results:
+                    route = classify_question(request.question, search_results)
+                    print(f"🧭 Routed question to the {route} path")
+                get_metrics().ask_requests.inc(route=route)
 
-            # Run the crew (non-streaming for now, as CrewAI streaming is complex)
-            result = backend_crew.crew().kickoff(inputs=inputs)
-            answer = str(result)
+                if route == ROUTE_AGENT:
+                    # Prepare inputs for the crew
+                    inputs = {"question": request.question}
 
-            # Stream the answer in chunks
-            chunk_size = 50
-            for i in range(0, len(answer), chunk_size):
-                chunk = answer[i:i + chunk_size]
-                yield f"data: {json.dumps({'type': 'content', 'data': chunk})}\n\n"
+                    # Run a pooled crew, forwarding final-answer tokens as the LLM produces them
+                    answer_stream = stream_kickoff(inputs, model)
+                else:
+                    # Single LLM call with the search results from above
+                    messages = build_messages(route, request.question, search_results.get("results", []))
+                    answer_stream = stream_llm_call(create_streaming_llm(model), messages)
 
-            # Send completion signal
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                answer_chunks = []
+                async for chunk in answer_stream:
+                    answer_chunks.append(chunk)
+                    yield f"data: {json.dumps({'type': 'content', 'data': chunk})}\n\n"
 
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'data': str(e)})}\n\n"
+                # Web results and current-events answers go stale long before the TTL
+                cacheable = not scope.used_web_search and not needs_fresh_information(request.question)
+                if use_answer_cache and cacheable and answer_chunks:
+                    get_answer_cache().put(
+                        embedding, model, kb_version, "".join(answer_chunks), sources_data, scope.scope_key
+                    )
+
+                # Send completion signal
+                yield f"data: {json.dumps({'type': 'done'})}\n\n"
+
+            except Exception as e:
+                yield f"data: {json.dumps({'type': 'error', 'data': str(e)})}\n\n"
 
     return StreamingResponse(
-        generate_stream(),
+        _observe_first_byte(generate_stream(), received_at),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -95,35 +173,160 @@ async def ask_question(request: AskRequest):
     )
 
 
-async def _extract_sources(question: str) -> List[SourceMetadata]:
+@router.post("/ask/batch")
+async def ask_batch(request: BatchAskRequest):
     """
-    Extract source metadata from Pinecone search results.
+    Answer many questions in one request (bulk evaluation, FAQ prefill).
+
+    Questions are embedded together, searched concurrently and answered a few
+    at a time (see backend.batch). Each answer is streamed back as one JSON
+    line as soon as it is ready, so results arrive out of order; use "index"
+    to match them to the questions.
+
+    Args:
+        request: BatchAskRequest containing the questions and model name
+
+    Returns:
+        NDJSON stream of results with "index", "question", "answer", "sources"
+        and "route" keys, or "error" for questions that failed
+    """
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="No questions provided")
+    max_questions = get_batch_max_questions()
+    if len(request.questions) > max_questions:
+        raise HTTPException(status_code=400, detail=f"At most {max_questions} questions per batch")
+    model = _resolve_model(request.modelName)
+    namespace, metadata_filter = _search_scope(request.namespace, request.filters)
+    if get_executor("crew").is_saturated():
+        raise HTTPException(status_code=503, detail="Too many questions in progress, please retry shortly")
+
+    async def generate_lines() -> AsyncGenerator[str, None]:
+        async for result in answer_batch(
+            request.questions,
+            model,
+            namespace=namespace,
+            filter=metadata_filter
+        ):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
+
+
+def _resolve_model(model_name: Optional[str]) -> str:
+    """
+    Check a request's model against the models offered by /api/models.
+
+    Args:
+        model_name: Requested model (None for DEFAULT_LLM_MODEL)
+
+    Returns:
+        Model to answer with
+
+    Raises:
+        HTTPException: 400 if the model is not offered
+    """
+    model = model_name or get_default_model()
+    if not is_available_model(model):
+        raise HTTPException(status_code=400, detail=f"Unknown model {model!r}, see /api/models")
+    return model
+
+
+def _search_scope(
+    namespace: Optional[str],
+    filters: Optional[SearchFilters]
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Validate a request's namespace and build its metadata filter.
+
+    Args:
+        namespace: Requested namespace (None for the default namespace)
+        filters: Requested search filters
+
+    Returns:
+        (namespace, metadata filter or None)
+
+    Raises:
+        HTTPException: 400 if the namespace name is invalid
+    """
+    try:
+        namespace = validate_namespace(namespace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return namespace, build_metadata_filter(**filters.model_dump()) if filters else None
+
+
+async def _observe_first_byte(stream: AsyncIterator[str], received_at: float) -> AsyncIterator[str]:
+    """
+    Pass SSE events through, recording the time from request to the first event.
+
+    Args:
+        stream: SSE event stream
+        received_at: perf_counter() when the request arrived
+
+    Yields:
+        The stream's events
+    """
+    first = True
+    async for event in stream:
+        if first:
+            get_metrics().observe("first_byte", time.perf_counter() - received_at)
+            first = False
+        yield event
+
+
+async def _embed_question(question: str) -> Optional[List[float]]:
+    """
+    Embed the question for the answer cache and the fast-path router.
+
+    The embedding is stored in the retrieval scope, so the search that follows
+    neither embeds the question again nor times it a second time.
 
     Args:
         question: User's question
 
     Returns:
-        List of source metadata
+        Question embedding, or None if the question could not be embedded
+    """
+    try:
+        with get_metrics().timed("query_embed"):
+            return await get_executor("search").run(get_openai_client().create_embedding, question)
+    except Exception as e:
+        print(f"Error embedding question: {e}")
+        return None
+
+
+async def _search_knowledge_base(question: str) -> Dict[str, Any]:
     """
+    Search the knowledge base for the question within the current retrieval scope.
+
+    Args:
+        question: User's question
+
+    Returns:
+        Search result dictionary from search_with_metadata (with an "error" key
+        if the search failed)
+    """
+    from backend.tools.pinecone_search import PineconeSearchTool
+
     try:
-        # Search Pinecone to get source metadata
-        pinecone_search = PineconeSearchTool()
-        search_results = pinecone_search.search_with_metadata(
+        return await get_executor("search").run(
+            PineconeSearchTool().search_with_metadata,
             query=question,
             top_k=5
         )
+    except Exception as e:
+        print(f"Error searching knowledge base: {e}")
+        return {"found_context": False, "results": [], "sources": [], "error": str(e)}
 
-        sources = []
-        if search_results.get("found_context", False):
-            for result in search_results.get("results", []):
-                sources.append(SourceMetadata(
-                    source_file=result.get("source_file", "Unknown"),
-                    page_number=result.get("chunk_index"),
-                    text=result.get("text", "")
-                ))
 
-        return sources
+def _extract_sources(search_results: Dict[str, Any]) -> List[SourceMetadata]:
+    """
+    Extract source metadata from Pinecone search results.
 
-    except Exception as e:
-        print(f"Error extracting sources: {e}")
-        return []
+    Args:
+        search_results: Search result dictionary from search_with_metadata
+
+    Returns:
+        List of source metadata
+    """
+    return [SourceMetadata(**citation) for citation in cite_results(search_results)]
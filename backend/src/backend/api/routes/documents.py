@@ -0,0 +1,80 @@
+"""
+Document endpoints: list and delete ingested documents per namespace.
+"""
+
+from typing import List
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from backend.clients.vector_store import validate_namespace
+from backend.concurrency import get_executor
+from backend.tools.document_manifest import get_manifest_store
+
+router = APIRouter()
+
+
+class DocumentInfo(BaseModel):
+    """An ingested document."""
+    source_file: str
+    chunks: int
+    updated_at: float
+
+
+class DeleteDocumentResponse(BaseModel):
+    """Response model for the delete endpoint."""
+    success: bool
+    message: str
+    vectors_deleted: int
+
+
+def _namespace(namespace: str) -> str:
+    """Validate a namespace query parameter, raising 400 if it is invalid."""
+    try:
+        return validate_namespace(namespace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/documents", response_model=List[DocumentInfo])
+async def list_documents(namespace: str = ""):
+    """
+    List the documents of a namespace.
+
+    Args:
+        namespace: Namespace to list (default namespace if empty)
+
+    Returns:
+        Documents with their chunk counts and last ingest time
+    """
+    namespace = _namespace(namespace)
+    documents = await get_executor("search").run(get_manifest_store().list_documents, namespace)
+    return [DocumentInfo(**document) for document in documents]
+
+
+@router.delete("/documents/{filename:path}", response_model=DeleteDocumentResponse)
+async def delete_document(filename: str, namespace: str = ""):
+    """
+    Delete a document and its vectors from a namespace.
+
+    Args:
+        filename: Source filename the document was uploaded as
+        namespace: Namespace holding the document (default namespace if empty)
+
+    Returns:
+        DeleteDocumentResponse with the number of vectors deleted
+    """
+    namespace = _namespace(namespace)
+
+    # The document processor imports crewai
+    from backend.tools.document_processor import DocumentProcessorTool
+
+    try:
+        deleted = await get_executor("ingest").run(DocumentProcessorTool().delete_document, filename, namespace)
+    except Exception as e:
+        print(f"❌ Could not delete {filename}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error deleting document: {e}")
+    if deleted is None:
+        raise HTTPException(status_code=404, detail=f"Document {filename} not found")
+
+    print(f"🗑️ Deleted {filename} ({deleted} vectors)")
+    return DeleteDocumentResponse(success=True, message=f"Deleted {filename}", vectors_deleted=deleted)
@@ -6,6 +6,8 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List
 
+from backend.crew_pool import get_default_model
+
 router = APIRouter()
 
 
@@ -21,6 +23,62 @@ class ModelsResponse(BaseModel):
     models: List[ModelInfo]
 
 
+# Define available models (OpenRouter format)
+AVAILABLE_MODELS = [
+    ModelInfo(
+        id="openai/gpt-4o",
+        name="GPT-4o",
+        provider="OpenAI"
+    ),
+    ModelInfo(
+        id="openai/gpt-4-turbo",
+        name="GPT-4 Turbo",
+        provider="OpenAI"
+    ),
+    ModelInfo(
+        id="openai/gpt-4",
+        name="GPT-4",
+        provider="OpenAI"
+    ),
+    ModelInfo(
+        id="openai/gpt-3.5-turbo",
+        name="GPT-3.5 Turbo",
+        provider="OpenAI"
+    ),
+    ModelInfo(
+        id="anthropic/claude-3.5-sonnet",
+        name="Claude 3.5 Sonnet",
+        provider="Anthropic"
+    ),
+    ModelInfo(
+        id="anthropic/claude-3-opus",
+        name="Claude 3 Opus",
+        provider="Anthropic"
+    ),
+    ModelInfo(
+        id="anthropic/claude-3-haiku",
+        name="Claude 3 Haiku",
+        provider="Anthropic"
+    ),
+]
+
+
+def is_available_model(model: str) -> bool:
+    """
+    Check whether requests may use a model.
+
+    Crews are pooled per model, so only the listed models and DEFAULT_LLM_MODEL
+    are accepted; arbitrary names would make the pool build crews without limit.
+
+    Args:
+        model: Model id
+
+    Returns:
+        True if the model is listed or is the default model
+    """
+    return model == get_default_model() or any(info.id == model for info in AVAILABLE_MODELS)
+
+
 @router.get("/models", response_model=ModelsResponse)
 async def get_models():
     """
@@ -29,43 +87,4 @@ async def get_models():
     Returns:
         ModelsResponse with list of available models
     """
-    # Define available models (OpenRouter format)
-    models = [
-        ModelInfo(
-            id="openai/gpt-4o",
-            name="GPT-4o",
-            provider="OpenAI"
-        ),
-        ModelInfo(
-            id="openai/gpt-4-turbo",
-            name="GPT-4 Turbo",
-            provider="OpenAI"
-        ),
-        ModelInfo(
-            id="openai/gpt-4",
-            name="GPT-4",
-            provider="OpenAI"
-        ),
-        ModelInfo(
-            id="openai/gpt-3.5-turbo",
-            name="GPT-3.5 Turbo",
-            provider="OpenAI"
-        ),
-        ModelInfo(
-            id="anthropic/claude-3.5-sonnet",
-            name="Claude 3.5 Sonnet",
-            provider="Anthropic"
-        ),
-        ModelInfo(
-            id="anthropic/claude-3-opus",
-            name="Claude 3 Opus",
-            provider="Anthropic"
-        ),
-        ModelInfo(
-            id="anthropic/claude-3-haiku",
-            name="Claude 3 Haiku",
-            provider="Anthropic"
-        ),
-    ]
-
-    return ModelsResponse(models=models)
+    return ModelsResponse(models=AVAILABLE_MODELS)
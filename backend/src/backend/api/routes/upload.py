@@ -3,12 +3,12 @@ Upload endpoint for document processing.
 """
 
 import os
-import tempfile
-from typing import List
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
 
-from backend.tools.document_processor import DocumentProcessorTool
+from backend.clients.vector_store import validate_namespace
+from backend.concurrency import ExecutorSaturatedError, get_executor
 
 router = APIRouter()
 
@@ -18,72 +18,97 @@ class UploadResponse(BaseModel):
     message: str
     files_processed: int
     details: List[str]
+    job_ids: List[str] = []
+
+
+class UploadJobStatus(BaseModel):
+    """Status and progress of a background ingestion job."""
+    job_id: str
+    filename: str
+    namespace: str = ""
+    status: str
+    pages_parsed: int
+    chunks_total: int
+    chunks_embedded: int
+    vectors_upserted: int
+    message: Optional[str] = None
+    created_at: float
+    updated_at: float
 
 
 @router.post("/upload", response_model=UploadResponse)
-async def upload_documents(files: List[UploadFile] = File(...)):
+async def upload_documents(files: List[UploadFile] = File(...), namespace: str = Form("")):
     """
-    Upload and process documents (PDF, DOCX, TXT).
+    Upload documents (PDF, DOCX, TXT) and queue them for background processing.
 
     Args:
         files: List of files to upload
+        namespace: Namespace (tenant or collection) to store the documents in
 
     Returns:
-        UploadResponse with processing details
+        UploadResponse with one job id per accepted file
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
-
-    # Initialize document processor tool
-    doc_processor = DocumentProcessorTool()
-
-    processed_files = []
+    try:
+        namespace = validate_namespace(namespace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    supported_files = [
+        file for file in files
+        if os.path.splitext(file.filename)[1].lower() in ['.pdf', '.docx', '.txt']
+    ]
+    if get_executor("ingest").free_slots() < len(supported_files):
+        raise HTTPException(status_code=503, detail="Too many uploads in progress, please retry shortly")
+
+    # backend.jobs imports crewai through the document processor tool
+    from backend.jobs import get_ingest_queue
+
+    ingest_queue = get_ingest_queue()
+    job_ids = []
     processing_details = []
 
     for file in files:
-        # Validate file type
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in ['.pdf', '.docx', '.txt']:
+        if file not in supported_files:
             processing_details.append(f"Skipped {file.filename}: Unsupported file type")
             continue
 
         try:
-            # Create a temporary file to store the upload
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-                # Read and write file content
-                content = await file.read()
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-
-            # Process the document with original filename
-            print(f"Processing file: {file.filename} (temp path: {temp_file_path})")
-            result = doc_processor._run(file_path=temp_file_path, original_filename=file.filename)
-            print(f"Result: {result}")
-
-            # Check if processing was successful
-            if "Error processing document" in result or "error" in result.lower():
-                processing_details.append(f"❌ {file.filename}: {result}")
-                print(f"ERROR: {file.filename} - {result}")
-            else:
-                processed_files.append(file.filename)
-                processing_details.append(f"✅ {file.filename}: {result}")
-                print(f"SUCCESS: {file.filename} - {result}")
-
+            content = await file.read()
+            job_id = ingest_queue.enqueue(file.filename, content, namespace)
+            job_ids.append(job_id)
+            processing_details.append(f"⏳ {file.filename}: queued as job {job_id}")
+        except ExecutorSaturatedError as e:
+            processing_details.append(f"❌ {file.filename}: {str(e)}")
         except Exception as e:
-            error_msg = f"Error processing {file.filename}: {str(e)}"
+            error_msg = f"Error queueing {file.filename}: {str(e)}"
             processing_details.append(f"❌ {error_msg}")
             print(f"EXCEPTION: {error_msg}")
-            import traceback
-            traceback.print_exc()
-            # Clean up temp file if it exists
-            try:
-                if 'temp_file_path' in locals():
-                    os.remove(temp_file_path)
-            except:
-                pass
 
     return UploadResponse(
-        message=f"Processed {len(processed_files)} file(s)",
-        files_processed=len(processed_files),
-        details=processing_details
+        message=f"Queued {len(job_ids)} file(s) for processing",
+        files_processed=len(job_ids),
+        details=processing_details,
+        job_ids=job_ids
     )
+
+
+@router.get("/upload/{job_id}", response_model=UploadJobStatus)
+async def get_upload_status(job_id: str):
+    """
+    Get the status and progress of a background ingestion job.
+
+    Args:
+        job_id: Job id returned by the upload endpoint
+
+    Returns:
+        UploadJobStatus with progress counters
+    """
+    from backend.jobs import get_ingest_queue
+
+    job = get_ingest_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Upload job {job_id} not found")
+
+    return UploadJobStatus(job_id=job.pop("id"), **job)
@@ -0,0 +1,251 @@
+"""
+Batch question answering for /api/ask/batch and the ask_batch command.
+
+Bulk jobs (nightly evaluations, FAQ prefill) care about throughput per dollar
+rather than latency, so a batch is answered differently from single questions:
+
+- repeated questions (ignoring case and spacing) are answered once
+- every question is embedded in one batched embeddings call, whose result the
+  searches that follow reuse
+- vector queries run concurrently (BATCH_SEARCH_CONCURRENCY at a time)
+- answers are generated by at most BATCH_CONCURRENCY questions at a time, so a
+  batch leaves crew workers free for interactive questions
+- cached answers, and the fast path of a single LLM call, are used exactly as
+  for /api/ask
+
+Every question of a batch is searched within the same namespace and metadata
+filter. Results are yielded in completion order, one dict per question, tagged
+with the question's index in the batch.
+
+If the caller stops reading (e.g. the client disconnects), questions that have
+not started are dropped, but crew kickoffs and LLM calls already running on the
+crew executor cannot be interrupted and run to completion.
+"""
+
+import os
+import json
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from backend.answer_cache import answer_cache_enabled, get_answer_cache
+from backend.clients.openai_client import get_openai_client
+from backend.concurrency import get_executor
+from backend.crew_pool import get_default_model
+from backend.fast_path import (
+    ROUTE_AGENT, build_messages, classify_question, fast_path_enabled, needs_fresh_information
+)
+from backend.metrics import get_metrics
+from backend.tools.document_manifest import get_manifest_store
+from backend.tools.retrieval_context import RetrievalContext, cite_results, retrieval_scope
+
+
+def get_batch_max_questions() -> int:
+    """Largest batch accepted by /api/ask/batch (BATCH_MAX_QUESTIONS)."""
+    return int(os.getenv("BATCH_MAX_QUESTIONS", "5000"))
+
+
+async def answer_batch(
+    questions: List[str],
+    model: Optional[str] = None,
+    namespace: str = "",
+    filter: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Answer a batch of questions, yielding each result as soon as it is ready.
+
+    Args:
+        questions: Questions to answer
+        model: LLM model (defaults to DEFAULT_LLM_MODEL)
+        namespace: Namespace the knowledge-base searches are restricted to
+        filter: Metadata filter the knowledge-base searches are restricted to
+
+    Yields:
+        Dicts with "index", "question", "answer", "sources" and "route" keys,
+        or "index", "question" and "error" if the question failed
+    """
+    model = model or get_default_model()
+    kb_version = get_manifest_store().get_version()
+
+    # Repeated questions share one answer
+    groups: Dict[str, List[int]] = {}
+    for index, question in enumerate(questions):
+        groups.setdefault(RetrievalContext.normalize(question), []).append(index)
+    unique = [questions[indexes[0]] for indexes in groups.values()]
+    embeddings = await _embed_questions(unique)
+
+    search_limit = asyncio.Semaphore(int(os.getenv("BATCH_SEARCH_CONCURRENCY", "8")))
+    answer_limit = asyncio.Semaphore(int(os.getenv("BATCH_CONCURRENCY", "4")))
+
+    async def answer_group(indexes: List[int], question: str, embedding: Optional[List[float]]):
+        result = await _answer_question(
+            question, embedding, model, kb_version, namespace, filter, search_limit, answer_limit
+        )
+        return indexes, result
+
+    tasks = [
+        asyncio.ensure_future(answer_group(indexes, question, embedding))
+        for indexes, question, embedding in zip(groups.values(), unique, embeddings)
+    ]
+    print(f"📦 Answering a batch of {len(questions)} question(s) ({len(unique)} unique)")
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            indexes, result = await next_result
+            for index in indexes:
+                yield {"index": index, "question": questions[index], **result}
+    finally:
+        # The client may stop reading before the batch is done. Cancelling stops
+        # questions that are waiting, but not a kickoff or LLM call already running
+        # in a crew worker thread
+        for task in tasks:
+            task.cancel()
+
+
+async def _embed_questions(questions: List[str]) -> List[Optional[List[float]]]:
+    """
+    Embed every question with batched calls (split at the EMBEDDING_BATCH_* limits).
+
+    Args:
+        questions: Questions to embed
+
+    Returns:
+        Embeddings in question order, or Nones if the batch could not be embedded
+        (each search then embeds its own question)
+    """
+    if not questions:
+        return []
+    try:
+        with get_metrics().timed("query_embed"):
+            return await get_executor("search").run(get_openai_client().create_embeddings, questions)
+    except Exception as e:
+        print(f"Error embedding batch questions: {e}")
+        return [None] * len(questions)
+
+
+async def _answer_question(
+    question: str,
+    embedding: Optional[List[float]],
+    model: str,
+    kb_version: int,
+    namespace: str,
+    filter: Optional[Dict[str, Any]],
+    search_limit: asyncio.Semaphore,
+    answer_limit: asyncio.Semaphore
+) -> Dict[str, Any]:
+    """
+    Answer one question of a batch.
+
+    Args:
+        question: Question to answer
+        embedding: Question embedding, if the batch was embedded
+        model: LLM model
+        kb_version: Knowledge-base version the answers are cached against
+        namespace: Namespace the searches are restricted to
+        filter: Metadata filter the searches are restricted to
+        search_limit: Bounds concurrent vector queries
+        answer_limit: Bounds concurrent answer generation
+
+    Returns:
+        Dict with "answer", "sources" and "route" keys, or an "error" key
+    """
+    from backend.crew import create_streaming_llm
+    from backend.streaming import stream_kickoff, stream_llm_call
+    from backend.tools.pinecone_search import PineconeSearchTool
+
+    # Each question gets its own retrieval scope, so the crew reuses the search below
+    with retrieval_scope(namespace, filter) as scope, get_metrics().timed("ask"):
+        try:
+            if embedding is not None:
+                scope.put_embedding(question, embedding)
+            use_answer_cache = embedding is not None and answer_cache_enabled()
+            if use_answer_cache:
+                cached = get_answer_cache().get(embedding, model, kb_version, scope.scope_key)
+                if cached is not None:
+                    get_metrics().ask_requests.inc(route="cache")
+                    return {"answer": cached.answer, "sources": cached.sources, "route": "cache"}
+
+            async with search_limit:
+                search_results = await get_executor("search").run(
+                    PineconeSearchTool().search_with_metadata,
+                    query=question,
+                    top_k=5
+                )
+            sources = cite_results(search_results)
+
+            async with answer_limit:
+                route = ROUTE_AGENT
+                if fast_path_enabled() and "error" not in search_results:
+                    route = classify_question(question, search_results)
+                get_metrics().ask_requests.inc(route=route)
+
+                if route == ROUTE_AGENT:
+                    answer_stream = stream_kickoff({"question": question}, model)
+                else:
+                    messages = build_messages(route, question, search_results.get("results", []))
+                    answer_stream = stream_llm_call(create_streaming_llm(model), messages)
+                answer = "".join([chunk async for chunk in answer_stream])
+
+            # Web results and current-events answers go stale long before the TTL
+            cacheable = not scope.used_web_search and not needs_fresh_information(question)
+            if use_answer_cache and cacheable and answer:
+                get_answer_cache().put(embedding, model, kb_version, answer, sources, scope.scope_key)
+            return {"answer": answer, "sources": sources, "route": route}
+
+        except Exception as e:
+            return {"error": str(e)}
+
+
+def read_questions(path: str) -> List[str]:
+    """
+    Read questions from a file with one question per line.
+
+    Lines may also be JSON objects with a "question" key (JSONL); blank lines
+    are skipped.
+
+    Args:
+        path: Questions file
+
+    Returns:
+        Questions in file order
+    """
+    questions = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    line = json.loads(line)["question"]
+                except (ValueError, KeyError):
+                    pass
+            questions.append(line)
+    return questions
+
+
+async def write_batch_answers(
+    input_path: str,
+    output_path: str,
+    model: Optional[str] = None,
+    namespace: str = ""
+) -> int:
+    """
+    Answer a questions file and write one JSON result per line as answers finish.
+
+    Args:
+        input_path: Questions file (see read_questions)
+        output_path: NDJSON output file
+        model: LLM model (defaults to DEFAULT_LLM_MODEL)
+        namespace: Namespace the knowledge-base searches are restricted to
+
+    Returns:
+        Number of questions that failed
+    """
+    questions = read_questions(input_path)
+    failed = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        async for result in answer_batch(questions, model, namespace=namespace):
+            failed += "error" in result
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    print(f"✅ Answered {len(questions) - failed}/{len(questions)} question(s), results in {output_path}")
+    return failed
@@ -0,0 +1,210 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an in-memory LRU backed by SQLite."""
+
+    _instance: Optional['EmbeddingCache'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        memory_entries: Optional[int] = None
+    ):
+        """
+        Initialize the cache with environment variables.
+
+        Args:
+            path: SQLite file path (defaults to EMBEDDING_CACHE_PATH)
+            max_entries: Maximum vectors kept on disk before LRU eviction
+            memory_entries: Maximum vectors kept in the in-memory LRU
+        """
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+        self.memory_entries = memory_entries or int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "10000"))
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+        self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @classmethod
+    def get_instance(cls) -> 'EmbeddingCache':
+        """Get singleton instance of EmbeddingCache."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so that trivially different inputs share a cache entry."""
+        text = unicodedata.normalize('NFC', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    @classmethod
+    def make_key(cls, text: str, model: str, dimensions: int) -> str:
+        """
+        Build the content-addressed key for a text.
+
+        Args:
+            text: Text that was embedded
+            model: Embedding model name
+            dimensions: Requested embedding dimension
+
+        Returns:
+            Hex SHA-256 digest of (model, dimensions, normalized text)
+        """
+        payload = f"{model}\x00{dimensions}\x00{cls.normalize(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Look up several keys, checking memory first and then SQLite.
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Mapping of found keys to their embedding vectors
+        """
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            missing = []
+            for key in unique_keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+
+            if missing:
+                now = time.time()
+                # SQLite limits the number of bound parameters per statement
+                for i in range(0, len(missing), 500):
+                    batch = missing[i:i + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = array('f', blob).tolist()
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+                    if rows:
+                        self._conn.executemany(
+                            "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                            [(now, key) for key, _ in rows]
+                        )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        Store embedding vectors in memory and on disk, evicting the least recently used.
+
+        Args:
+            items: Mapping of cache keys to embedding vectors
+        """
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            new_keys = 0
+            for key, vector in items.items():
+                self._remember(key, vector)
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                    (key, array('f', vector).tobytes(), now)
+                )
+                new_keys += cursor.rowcount
+            self._disk_entries += new_keys
+
+            overflow = self._disk_entries - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                    (overflow,)
+                )
+                self._disk_entries -= overflow
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Drop every cached vector and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._disk_entries = 0
+            self.hits = self.misses = self.memory_hits = self.disk_hits = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current cache sizes."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_entries,
+        }
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+# Convenience function to get cache instance
+def get_embedding_cache() -> EmbeddingCache:
+    """Get singleton instance of EmbeddingCache."""
+    return EmbeddingCache.get_instance()
@@ -0,0 +1,200 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClient:
+    """
+    Shared pooled HTTP client for outbound requests from tools.
+
+    Wraps one httpx.Client and one httpx.AsyncClient so connections (and their
+    TLS sessions) are kept alive and reused across requests, with HTTP/2 when h2
+    is installed. Requests to the same host are limited to HTTP_MAX_PER_HOST at
+    a time, and connection errors, timeouts and 429/5xx responses are retried
+    with jittered exponential backoff.
+    """
+
+    _instance: Optional['HTTPClient'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        """Initialize the pooled clients with environment variables."""
+        self.timeout = float(os.getenv("HTTP_TIMEOUT", "10"))
+        self.max_retries = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.backoff_base = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+        self.backoff_max = float(os.getenv("HTTP_BACKOFF_MAX", "4"))
+        self.max_per_host = int(os.getenv("HTTP_MAX_PER_HOST", "8"))
+
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "64")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "32")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+        )
+        http2 = _http2_available()
+        self.client = httpx.Client(limits=limits, timeout=self.timeout, http2=http2, follow_redirects=True)
+        self.async_client = httpx.AsyncClient(limits=limits, timeout=self.timeout, http2=http2, follow_redirects=True)
+
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = defaultdict(
+            lambda: threading.BoundedSemaphore(self.max_per_host)
+        )
+        self._async_host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_per_host)
+        )
+        self._semaphores_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'HTTPClient':
+        """Get singleton instance of HTTPClient."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def request(self, method: str, url: str, max_retries: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request with per-host limiting and retries.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            max_retries: Retries for this request (defaults to HTTP_MAX_RETRIES)
+            **kwargs: Passed to httpx.Client.request (params, data, json, headers, timeout, ...)
+
+        Returns:
+            The final response (after retries, a retryable status may still be returned)
+
+        Raises:
+            httpx.TransportError: If every attempt failed to get a response
+        """
+        with self._semaphores_lock:
+            semaphore = self._host_semaphores[urlsplit(url).netloc]
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        attempt = 0
+        while True:
+            try:
+                with semaphore:
+                    response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                delay = self._backoff(attempt, response)
+            time.sleep(delay)
+            attempt += 1
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        max_retries: Optional[int] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Async version of request, sharing the same limits and retry policy.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            max_retries: Retries for this request (defaults to HTTP_MAX_RETRIES)
+            **kwargs: Passed to httpx.AsyncClient.request
+
+        Returns:
+            The final response
+
+        Raises:
+            httpx.TransportError: If every attempt failed to get a response
+        """
+        with self._semaphores_lock:
+            semaphore = self._async_host_semaphores[urlsplit(url).netloc]
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    response = await self.async_client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                delay = self._backoff(attempt, response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @contextmanager
+    def stream(self, method: str, url: str, **kwargs: Any) -> Iterator[httpx.Response]:
+        """
+        Send a request without reading its body, with per-host limiting but no retries.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to httpx.Client.stream
+
+        Yields:
+            The response, whose body is read on demand (e.g. with iter_bytes)
+        """
+        with self._semaphores_lock:
+            semaphore = self._host_semaphores[urlsplit(url).netloc]
+        with semaphore, self.client.stream(method, url, **kwargs) as response:
+            yield response
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a GET request (see request)."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a POST request (see request)."""
+        return self.request("POST", url, **kwargs)
+
+    async def aget(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send an async GET request (see arequest)."""
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send an async POST request (see arequest)."""
+        return await self.arequest("POST", url, **kwargs)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Delay before the next attempt: Retry-After if given, else full-jitter exponential backoff."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+# Convenience function to get client instance
+def get_http_client() -> HTTPClient:
+    """Get singleton instance of HTTPClient."""
+    return HTTPClient.get_instance()
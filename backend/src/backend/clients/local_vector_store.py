@@ -0,0 +1,549 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.clients.vector_store import VectorMatch, VectorStore
+
+QUANTIZATION_NONE = "none"
+QUANTIZATION_INT8 = "int8"
+QUANTIZATION_BINARY = "binary"
+
+# Rows scored per block, keeping the float32 copy made of a block of codes in L2 cache
+_SCORE_BLOCK = 256
+# Binary codes keep less information, so they need a longer shortlist
+_DEFAULT_RESCORE_FACTORS = {QUANTIZATION_INT8: 4, QUANTIZATION_BINARY: 10}
+# Metadata filter comparison operators and their SQL equivalents
+_FILTER_OPERATORS = {"$eq": "=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store for single-node deployments and offline testing.
+
+    Vectors live in a memory-mapped float32 matrix (vectors.f32) with a SQLite
+    sidecar holding ids and metadata. Small collections are searched exactly;
+    once LOCAL_VECTOR_STORE_IVF_MIN vectors are stored, an IVF index (spherical
+    k-means centroids plus a memory-mapped list assignment per row) restricts
+    each query to the LOCAL_VECTOR_STORE_NPROBE closest lists. Sparse vectors
+    are kept as an inverted index of postings in the SQLite sidecar.
+
+    Each row belongs to a namespace, kept in memory as a per-row namespace
+    number so a query only scores its own namespace. Metadata filters are
+    evaluated by SQLite over the JSON metadata; a filtered query scores only
+    the matching rows, exactly. Vector ids are unique across namespaces.
+
+    With LOCAL_VECTOR_STORE_QUANTIZATION=int8 or binary, the first pass scans
+    compact codes instead of the float32 matrix: int8 codes with a per-row scale
+    (4x smaller) or sign bits (32x smaller). The
+    top_k * LOCAL_VECTOR_STORE_RESCORE_FACTOR candidates are then rescored with
+    their full-precision vectors, which are read from the memory map only for
+    those rows. Quantization saves memory, not latency: numpy has no int8 or
+    bit matrix kernels, so codes are widened to float32 block by block and the
+    first pass is about as fast as an exact float32 scan while the matrix
+    fits in RAM.
+
+    Lowering EMBEDDING_DIMENSION truncates the stored vectors to their leading
+    components and renormalizes them (Matryoshka embeddings such as
+    text-embedding-3 keep their meaning when shortened), so the store shrinks
+    without re-embedding any documents.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: Optional[str] = None, dimension: Optional[int] = None):
+        """
+        Open (or create) the store with environment variables.
+
+        Args:
+            path: Directory holding the store files (defaults to LOCAL_VECTOR_STORE_PATH)
+            dimension: Embedding dimension (defaults to EMBEDDING_DIMENSION)
+        """
+        self.path = path or os.getenv("LOCAL_VECTOR_STORE_PATH", ".cache/vector_store")
+        self.dimension = dimension or int(os.getenv("EMBEDDING_DIMENSION", "1024"))
+        self.ivf_min_vectors = int(os.getenv("LOCAL_VECTOR_STORE_IVF_MIN", "20000"))
+        self.nprobe = int(os.getenv("LOCAL_VECTOR_STORE_NPROBE", "16"))
+        self.quantization = os.getenv("LOCAL_VECTOR_STORE_QUANTIZATION", QUANTIZATION_NONE).lower()
+        if self.quantization not in (QUANTIZATION_NONE, QUANTIZATION_INT8, QUANTIZATION_BINARY):
+            raise ValueError(f"Unsupported LOCAL_VECTOR_STORE_QUANTIZATION: {self.quantization}")
+        self.rescore_factor = max(1, int(
+            os.getenv("LOCAL_VECTOR_STORE_RESCORE_FACTOR") or _DEFAULT_RESCORE_FACTORS.get(self.quantization, 1)
+        ))
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._assignments_path = os.path.join(self.path, "assignments.i32")
+        self._centroids_path = os.path.join(self.path, "centroids.npy")
+        self._codes_path = os.path.join(self.path, "codes.i8")
+        self._scales_path = os.path.join(self.path, "scales.f32")
+        self._bits_path = os.path.join(self.path, "bits.u8")
+        self._code_bytes = (self.dimension + 7) // 8
+
+        self._conn = sqlite3.connect(os.path.join(self.path, "metadata.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE, metadata TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings (term INTEGER NOT NULL, row INTEGER NOT NULL, "
+            "weight REAL NOT NULL, PRIMARY KEY (term, row))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_row ON postings(row)")
+        columns = [column[1] for column in self._conn.execute("PRAGMA table_info(vectors)")]
+        if "namespace" not in columns:
+            # Stores created before namespaces keep their vectors in the default namespace
+            self._conn.execute("ALTER TABLE vectors ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+        row_namespaces = self._conn.execute("SELECT row, namespace FROM vectors").fetchall()
+        rows = [row for row, _ in row_namespaces]
+        self._high_water = max(rows) + 1 if rows else 0
+        stored_dimension = int(self._get_setting("dimension") or self.dimension)
+        if stored_dimension < self.dimension:
+            raise ValueError(
+                f"Local vector store holds {stored_dimension}-dimensional vectors, but EMBEDDING_DIMENSION "
+                f"is {self.dimension}; reset the knowledge base to re-embed at the higher dimension"
+            )
+        if stored_dimension > self.dimension:
+            self._truncate_vectors(stored_dimension)
+        self._set_setting("dimension", str(self.dimension))
+        self._open_matrices(max(self.INITIAL_CAPACITY, self._high_water))
+
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._live[rows] = True
+        self._namespace_ids: Dict[str, int] = {}
+        self._row_namespaces = np.full(self._capacity, -1, dtype=np.int32)
+        for row, namespace in row_namespaces:
+            self._row_namespaces[row] = self._namespace_id(namespace)
+        self._free_rows = sorted(set(range(self._high_water)) - set(rows), reverse=True)
+
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_count = 0
+        if os.path.exists(self._centroids_path):
+            self._centroids = np.load(self._centroids_path)
+            self._trained_count = len(rows)
+        elif self.count >= self.ivf_min_vectors:
+            # Centroids are dropped when the dimension changes
+            self._train_ivf()
+
+        # Codes are derived from the float32 vectors, so rebuild them when the mode changed
+        if self._get_setting("quantization") != self.quantization:
+            self._encode_rows(np.nonzero(self._live[:self._high_water])[0])
+            self._set_setting("quantization", self.quantization)
+
+    @property
+    def count(self) -> int:
+        """Number of stored vectors."""
+        return self._high_water - len(self._free_rows)
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        if not vectors:
+            return
+
+        with self._lock:
+            namespace_id = self._namespace_id(namespace)
+            existing = self._rows_for_ids([vector["id"] for vector in vectors])
+            records = []
+            postings = []
+            for vector in vectors:
+                row = existing.get(vector["id"])
+                if row is None:
+                    row = self._allocate_row()
+                    existing[vector["id"]] = row
+                values = np.asarray(vector["values"], dtype=np.float32)
+                self._vectors[row] = values
+                self._assignments[row] = self._nearest_list(values)
+                self._encode(np.asarray([row]), values[None, :])
+                self._live[row] = True
+                self._row_namespaces[row] = namespace_id
+                records.append((vector["id"], row, json.dumps(vector.get("metadata", {})), namespace))
+                sparse = vector.get("sparse_values")
+                if sparse:
+                    postings.extend(zip(sparse["indices"], [row] * len(sparse["indices"]), sparse["values"]))
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (id, row, metadata, namespace) VALUES (?, ?, ?, ?)", records
+            )
+            self._conn.executemany("DELETE FROM postings WHERE row = ?", [(record[1],) for record in records])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO postings (term, row, weight) VALUES (?, ?, ?)", postings
+            )
+            self._conn.commit()
+            self._flush()
+
+            # Retrain the IVF lists whenever the collection has doubled since the last training
+            if self.count >= self.ivf_min_vectors and self.count >= 2 * self._trained_count:
+                self._train_ivf()
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        sparse_vector: Optional[Dict[str, list]] = None,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[VectorMatch]:
+        query = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            if self._high_water == 0 or top_k <= 0 or namespace not in self._namespace_ids:
+                return []
+
+            live = self._live[:self._high_water] & (
+                self._row_namespaces[:self._high_water] == self._namespace_ids[namespace]
+            )
+            sparse_scores = self._sparse_scores(sparse_vector) if sparse_vector else None
+            if filter:
+                # Only matching rows are scored, so a selective filter is cheaper than probing lists
+                live &= self._filter_mask(filter, namespace)
+                candidates = np.nonzero(live)[0]
+            elif self._centroids is not None:
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe_lists = np.argpartition(self._centroids @ query, -nprobe)[-nprobe:]
+                mask = live & np.isin(self._assignments[:self._high_water], probe_lists)
+                if sparse_scores is not None:
+                    # Lexical matches are candidates even outside the probed lists
+                    mask |= live & (sparse_scores > 0)
+                candidates = np.nonzero(mask)[0]
+            else:
+                candidates = np.nonzero(live)[0]
+            if len(candidates) == 0:
+                return []
+
+            if self.quantization != QUANTIZATION_NONE:
+                # Approximate first pass over the codes, then rescore a shortlist exactly
+                scores = self._approximate_scores(candidates, query)
+                if sparse_scores is not None:
+                    scores += sparse_scores[candidates]
+                shortlist = min(top_k * self.rescore_factor, len(candidates))
+                candidates = candidates[np.argpartition(scores, -shortlist)[-shortlist:]]
+                candidates.sort()
+
+            if self._centroids is None and self.quantization == QUANTIZATION_NONE and not filter:
+                scores = (self._vectors[:self._high_water] @ query)[candidates]
+            else:
+                scores = self._vectors[candidates] @ query
+            if sparse_scores is not None:
+                scores += sparse_scores[candidates]
+
+            k = min(top_k, len(candidates))
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            rows = [int(candidates[i]) for i in top]
+            row_scores = {row: float(scores[i]) for row, i in zip(rows, top)}
+
+            placeholders = ",".join("?" * len(rows))
+            records = self._conn.execute(
+                f"SELECT id, row, metadata FROM vectors WHERE row IN ({placeholders})", rows
+            ).fetchall()
+
+        by_row = {row: (vector_id, metadata) for vector_id, row, metadata in records}
+        return [
+            VectorMatch(id=by_row[row][0], score=row_scores[row], metadata=json.loads(by_row[row][1]))
+            for row in rows if row in by_row
+        ]
+
+    def update_metadata(self, vector_id: str, metadata: Dict[str, Any], namespace: str = "") -> None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM vectors WHERE id = ? AND namespace = ?", (vector_id, namespace)
+            ).fetchone()
+            if row is None:
+                return
+            merged = {**json.loads(row[0]), **metadata}
+            self._conn.execute("UPDATE vectors SET metadata = ? WHERE id = ?", (json.dumps(merged), vector_id))
+            self._conn.commit()
+
+    def fetch_metadata(self, ids: List[str], namespace: str = "") -> Dict[str, Dict[str, Any]]:
+        metadata = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                metadata.update(
+                    (vector_id, json.loads(values)) for vector_id, values in self._conn.execute(
+                        f"SELECT id, metadata FROM vectors WHERE id IN ({placeholders}) AND namespace = ?",
+                        [*batch, namespace]
+                    )
+                )
+        return metadata
+
+    def delete(self, ids: List[str], namespace: str = "") -> None:
+        with self._lock:
+            rows = self._rows_for_ids(ids, namespace)
+            if not rows:
+                return
+            for row in rows.values():
+                self._live[row] = False
+                self._free_rows.append(row)
+            self._conn.executemany("DELETE FROM vectors WHERE id = ?", [(vector_id,) for vector_id in rows])
+            self._conn.executemany("DELETE FROM postings WHERE row = ?", [(row,) for row in rows.values()])
+            self._conn.commit()
+
+    def delete_all(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM vectors")
+            self._conn.execute("DELETE FROM postings")
+            self._conn.commit()
+            self._live[:] = False
+            self._high_water = 0
+            self._free_rows = []
+            self._centroids = None
+            self._trained_count = 0
+            if os.path.exists(self._centroids_path):
+                os.remove(self._centroids_path)
+
+    def _open_matrices(self, capacity: int) -> None:
+        """Memory-map the vector, assignment and code files, growing them to capacity rows."""
+        files = [(self._vectors_path, 4, self.dimension), (self._assignments_path, 4, 1)]
+        if self.quantization == QUANTIZATION_INT8:
+            files += [(self._codes_path, 1, self.dimension), (self._scales_path, 4, 1)]
+        elif self.quantization == QUANTIZATION_BINARY:
+            files.append((self._bits_path, 1, self._code_bytes))
+        for file_path, itemsize, width in files:
+            size = capacity * itemsize * width
+            with open(file_path, 'ab') as f:
+                if f.tell() < size:
+                    f.truncate(size)
+
+        self._capacity = capacity
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(capacity, self.dimension))
+        self._assignments = np.memmap(self._assignments_path, dtype=np.int32, mode='r+',
+                                      shape=(capacity,))
+        self._codes = self._scales = self._bits = None
+        if self.quantization == QUANTIZATION_INT8:
+            self._codes = np.memmap(self._codes_path, dtype=np.int8, mode='r+',
+                                    shape=(capacity, self.dimension))
+            self._scales = np.memmap(self._scales_path, dtype=np.float32, mode='r+', shape=(capacity,))
+        elif self.quantization == QUANTIZATION_BINARY:
+            self._bits = np.memmap(self._bits_path, dtype=np.uint8, mode='r+',
+                                   shape=(capacity, self._code_bytes))
+
+    def _flush(self) -> None:
+        """Write the memory-mapped files to disk."""
+        for matrix in (self._vectors, self._assignments, self._codes, self._scales, self._bits):
+            if matrix is not None:
+                matrix.flush()
+
+    def _allocate_row(self) -> int:
+        """Reuse a deleted row or append one, doubling the files when full."""
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        if self._high_water == self._capacity:
+            self._flush()
+            del self._vectors, self._assignments, self._codes, self._scales, self._bits
+            self._open_matrices(self._capacity * 2)
+            live = np.zeros(self._capacity, dtype=bool)
+            live[:len(self._live)] = self._live
+            self._live = live
+            row_namespaces = np.full(self._capacity, -1, dtype=np.int32)
+            row_namespaces[:len(self._row_namespaces)] = self._row_namespaces
+            self._row_namespaces = row_namespaces
+
+        row = self._high_water
+        self._high_water += 1
+        return row
+
+    def _rows_for_ids(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, int]:
+        """Look up the matrix rows of stored ids, optionally only within one namespace."""
+        rows: Dict[str, int] = {}
+        for i in range(0, len(ids), 500):
+            batch = ids[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            sql = f"SELECT id, row FROM vectors WHERE id IN ({placeholders})"
+            if namespace is not None:
+                sql += " AND namespace = ?"
+                batch = [*batch, namespace]
+            rows.update(self._conn.execute(sql, batch).fetchall())
+        return rows
+
+    def _namespace_id(self, namespace: str) -> int:
+        """Number identifying a namespace in the in-memory row namespaces."""
+        if namespace not in self._namespace_ids:
+            self._namespace_ids[namespace] = len(self._namespace_ids)
+        return self._namespace_ids[namespace]
+
+    def _filter_mask(self, filter: Dict[str, Any], namespace: str) -> np.ndarray:
+        """Rows of a namespace whose metadata matches a filter."""
+        condition, params = self._filter_sql(filter)
+        rows = [row for (row,) in self._conn.execute(
+            f"SELECT row FROM vectors WHERE namespace = ? AND {condition}", [namespace, *params]
+        )]
+        mask = np.zeros(self._high_water, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    @classmethod
+    def _filter_sql(cls, filter: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        Translate a Pinecone-style metadata filter into an SQL condition.
+
+        Each field condition tests the elements of the field's JSON value
+        (json_each yields a scalar as its only element), so conditions on list
+        fields match if any element matches.
+
+        Raises:
+            ValueError: If the filter uses an unsupported operator
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        for key, condition in filter.items():
+            if key in ("$and", "$or"):
+                parts = [cls._filter_sql(part) for part in condition]
+                joiner = " AND " if key == "$and" else " OR "
+                clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")" if parts else "1")
+                params.extend(param for _, part_params in parts for param in part_params)
+                continue
+
+            path = '$."' + key.replace('"', '') + '"'
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, value in condition.items():
+                elements = "SELECT 1 FROM json_each(vectors.metadata, ?) WHERE value"
+                if operator == "$exists":
+                    clauses.append(f"json_type(vectors.metadata, ?) IS {'NOT ' if value else ''}NULL")
+                    params.append(path)
+                elif operator in ("$in", "$nin"):
+                    placeholders = ",".join("?" * len(value)) or "NULL"
+                    negate = "NOT " if operator == "$nin" else ""
+                    clauses.append(f"{negate}EXISTS ({elements} IN ({placeholders}))")
+                    params.extend([path, *value])
+                elif operator == "$ne":
+                    clauses.append(f"NOT EXISTS ({elements} = ?)")
+                    params.extend([path, value])
+                elif operator in _FILTER_OPERATORS:
+                    clauses.append(f"EXISTS ({elements} {_FILTER_OPERATORS[operator]} ?)")
+                    params.extend([path, value])
+                else:
+                    raise ValueError(f"Unsupported metadata filter operator: {operator}")
+        return " AND ".join(clauses) or "1", params
+
+    def _get_setting(self, key: str) -> Optional[str]:
+        """Read a value from the settings table."""
+        row = self._conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_setting(self, key: str, value: str) -> None:
+        """Write a value to the settings table."""
+        self._conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+        self._conn.commit()
+
+    def _truncate_vectors(self, stored_dimension: int) -> None:
+        """Rewrite vectors.f32 with the first self.dimension components of each row, renormalized."""
+        print(f"🔄 Truncating stored vectors from {stored_dimension} to {self.dimension} dimensions...")
+        capacity = os.path.getsize(self._vectors_path) // (4 * stored_dimension)
+        source = np.memmap(self._vectors_path, dtype=np.float32, mode='r', shape=(capacity, stored_dimension))
+        temp_path = self._vectors_path + ".tmp"
+        target = np.memmap(temp_path, dtype=np.float32, mode='w+', shape=(capacity, self.dimension))
+        for start in range(0, self._high_water, _SCORE_BLOCK):
+            block = np.array(source[start:start + _SCORE_BLOCK, :self.dimension])
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            target[start:start + len(block)] = block / np.where(norms > 0, norms, 1)
+        target.flush()
+        del source, target
+        os.replace(temp_path, self._vectors_path)
+
+        # Centroids are retrained and codes rebuilt for the new dimension
+        if os.path.exists(self._centroids_path):
+            os.remove(self._centroids_path)
+        self._set_setting("quantization", "")
+
+    def _encode(self, rows: np.ndarray, values: np.ndarray) -> None:
+        """Store the quantized codes of full-precision vectors."""
+        if self.quantization == QUANTIZATION_INT8:
+            scales = np.abs(values).max(axis=1) / 127
+            scales[scales == 0] = 1
+            self._codes[rows] = np.rint(values / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        elif self.quantization == QUANTIZATION_BINARY:
+            self._bits[rows] = np.packbits(values > 0, axis=1)
+
+    def _encode_rows(self, rows: np.ndarray) -> None:
+        """Rebuild the codes of stored rows from their float32 vectors."""
+        if self.quantization == QUANTIZATION_NONE or len(rows) == 0:
+            return
+        print(f"🔄 Building {self.quantization} codes for {len(rows)} stored vectors...")
+        for start in range(0, len(rows), _SCORE_BLOCK):
+            batch = rows[start:start + _SCORE_BLOCK]
+            self._encode(batch, np.asarray(self._vectors[batch]))
+        self._flush()
+
+    def _approximate_scores(self, candidates: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Estimate the dot products of candidate rows with the query from their codes."""
+        scores = np.empty(len(candidates), dtype=np.float32)
+        # Every live row is a candidate without IVF, so blocks can be sliced instead of gathered
+        contiguous = len(candidates) == candidates[-1] + 1
+        for start in range(0, len(candidates), _SCORE_BLOCK):
+            end = min(start + _SCORE_BLOCK, len(candidates))
+            batch = slice(start, end) if contiguous else candidates[start:end]
+            if self.quantization == QUANTIZATION_INT8:
+                scores[start:end] = (self._codes[batch].astype(np.float32) @ query) * self._scales[batch]
+            else:
+                # Asymmetric: the full-precision query against the signs (+1/-1) of each row
+                bits = np.unpackbits(self._bits[batch], axis=1, count=self.dimension)
+                scores[start:end] = 2 * (bits.astype(np.float32) @ query) - query.sum()
+        if self.quantization == QUANTIZATION_BINARY:
+            # Components of a unit vector average sqrt(2 / (pi * dimension)) in magnitude
+            scores *= np.sqrt(2 / (np.pi * self.dimension))
+        return scores
+
+    def _sparse_scores(self, sparse_vector: Dict[str, list]) -> np.ndarray:
+        """Sparse dot product of the query with every row, from the postings of its terms."""
+        scores = np.zeros(self._high_water, dtype=np.float32)
+        weights = dict(zip(sparse_vector["indices"], sparse_vector["values"]))
+        terms = list(weights)
+        for i in range(0, len(terms), 500):
+            batch = terms[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            postings = self._conn.execute(
+                f"SELECT term, row, weight FROM postings WHERE term IN ({placeholders})", batch
+            ).fetchall()
+            if postings:
+                term_ids, rows, values = zip(*postings)
+                contributions = np.asarray(values, dtype=np.float32) * np.asarray(
+                    [weights[term] for term in term_ids], dtype=np.float32
+                )
+                np.add.at(scores, np.asarray(rows), contributions)
+        return scores
+
+    def _nearest_list(self, values: np.ndarray) -> int:
+        """IVF list of a vector, or -1 while the index is untrained."""
+        if self._centroids is None:
+            return -1
+        return int(np.argmax(self._centroids @ values))
+
+    def _train_ivf(self, iterations: int = 10) -> None:
+        """Train spherical k-means centroids on a sample and reassign every row."""
+        rows = np.nonzero(self._live[:self._high_water])[0]
+        if len(rows) == 0:
+            return
+        # LOCAL_VECTOR_STORE_IVF_MIN may be below 16, so there can be fewer rows than lists
+        nlist = min(int(np.clip(np.sqrt(len(rows)), 16, 1024)), len(rows))
+        rng = np.random.default_rng(0)
+        sample = self._vectors[rng.choice(rows, size=min(len(rows), nlist * 64), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+        for start in range(0, len(rows), 8192):
+            batch = rows[start:start + 8192]
+            self._assignments[batch] = np.argmax(self._vectors[batch] @ centroids.T, axis=1)
+        self._assignments.flush()
+
+        self._centroids = centroids
+        self._trained_count = len(rows)
+        np.save(self._centroids_path, centroids)
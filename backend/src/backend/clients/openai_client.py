@@ -1,12 +1,21 @@
 import os
+import threading
 from openai import OpenAI
-from typing import List, Optional
+from typing import Iterator, List, Optional
+
+from backend.clients.embedding_cache import EmbeddingCache, get_embedding_cache
+from backend.clients.tokenizer import count_tokens
+from backend.metrics import get_metrics
+
+# The embeddings API rejects requests with more inputs than this
+MAX_EMBEDDING_INPUTS = 2048
 
 
 class OpenAIClient:
     """Client for OpenAI API operations."""
 
     _instance: Optional['OpenAIClient'] = None
+    _instance_lock = threading.Lock()
 
     def __init__(self):
         """Initialize OpenAI client with environment variables."""
@@ -21,11 +30,17 @@ class OpenAIClient:
         # Initialize OpenAI client
         self.client = OpenAI(api_key=self.api_key)
 
+        # Disk-backed embedding cache (set EMBEDDING_CACHE_ENABLED=false to bypass)
+        cache_enabled = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.embedding_cache: Optional[EmbeddingCache] = get_embedding_cache() if cache_enabled else None
+
     @classmethod
     def get_instance(cls) -> 'OpenAIClient':
         """Get singleton instance of OpenAIClient."""
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     def create_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
@@ -40,12 +55,15 @@ class OpenAIClient:
             List of embedding values
         """
         model = model or self.embedding_model
-        response = self.client.embeddings.create(
-            input=text,
-            model=model,
-            dimensions=self.embedding_dimension
-        )
-        return response.data[0].embedding
+        if self.embedding_cache is None:
+            response = self.client.embeddings.create(
+                input=text,
+                model=model,
+                dimensions=self.embedding_dimension
+            )
+            self._record_usage(response, model)
+            return response.data[0].embedding
+        return self._create_embeddings_cached([text], model)[0]
 
     def create_embeddings(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
         """
@@ -59,12 +77,94 @@ class OpenAIClient:
             List of embedding vectors
         """
         model = model or self.embedding_model
-        response = self.client.embeddings.create(
-            input=texts,
-            model=model,
-            dimensions=self.embedding_dimension
-        )
-        return [item.embedding for item in response.data]
+        if self.embedding_cache is None:
+            return self._request_embeddings(texts, model)
+        return self._create_embeddings_cached(texts, model)
+
+    def _create_embeddings_cached(self, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Embed texts through the cache, sending only unseen texts to the API.
+
+        Args:
+            texts: List of texts to embed
+            model: Embedding model to use
+
+        Returns:
+            List of embedding vectors in the same order as texts
+        """
+        keys = [
+            EmbeddingCache.make_key(text, model, self.embedding_dimension)
+            for text in texts
+        ]
+        cached = self.embedding_cache.get_many(keys)
+
+        # Embed each missing key once, even if it appears several times in the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            embeddings = self._request_embeddings(list(missing.values()), model)
+            fresh = dict(zip(missing.keys(), embeddings))
+            self.embedding_cache.put_many(fresh)
+            cached.update(fresh)
+
+        return [cached[key] for key in keys]
+
+    def _request_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Embed texts with as many API requests as the request limits need.
+
+        Args:
+            texts: List of texts to embed
+            model: Embedding model to use
+
+        Returns:
+            List of embedding vectors in the same order as texts
+        """
+        embeddings: List[List[float]] = []
+        for batch in self._request_batches(texts):
+            response = self.client.embeddings.create(
+                input=batch,
+                model=model,
+                dimensions=self.embedding_dimension
+            )
+            self._record_usage(response, model)
+            embeddings.extend(item.embedding for item in response.data)
+        return embeddings
+
+    @staticmethod
+    def _request_batches(texts: List[str]) -> Iterator[List[str]]:
+        """
+        Split texts into requests bounded by EMBEDDING_BATCH_MAX_TOKENS and
+        EMBEDDING_BATCH_MAX_SIZE (at most MAX_EMBEDDING_INPUTS).
+
+        Args:
+            texts: List of texts to embed
+
+        Yields:
+            Consecutive slices of texts, one per embedding request
+        """
+        max_tokens = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+        max_size = min(int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "256")), MAX_EMBEDDING_INPUTS)
+
+        start = 0
+        batch_tokens = 0
+        for end, text in enumerate(texts):
+            text_tokens = count_tokens(text)
+            if end > start and (batch_tokens + text_tokens > max_tokens or end - start >= max_size):
+                yield texts[start:end]
+                start, batch_tokens = end, 0
+            batch_tokens += text_tokens
+        if start < len(texts):
+            yield texts[start:]
+
+    def _record_usage(self, response, model: str) -> None:
+        """Count the tokens an embedding request used."""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            get_metrics().embedding_tokens.inc(usage.total_tokens, model=model)
 
 
 # Convenience function to get client instance
@@ -1,4 +1,5 @@
 import os
+import threading
 from pinecone import Pinecone, ServerlessSpec
 from typing import Optional
 
@@ -7,6 +8,7 @@ class PineconeClient:
     """Client for Pinecone vector database operations."""
 
     _instance: Optional['PineconeClient'] = None
+    _instance_lock = threading.Lock()
 
     def __init__(self):
         """Initialize Pinecone client with environment variables."""
@@ -25,7 +27,9 @@ class PineconeClient:
     def get_instance(cls) -> 'PineconeClient':
         """Get singleton instance of PineconeClient."""
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     def get_or_create_index(self, dimension: int = 1024, metric: str = "dotproduct"):
@@ -0,0 +1,264 @@
+import os
+import re
+import math
+import zlib
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Keeps identifiers such as "ERR-4012", "v1.2.3" or "part_no" together as one term
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./:][a-z0-9]+)*")
+_PART_PATTERN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how i in is it its of on or that the
+their there these this to was were what when where which who why will with you your
+""".split())
+
+SparseVector = Dict[str, list]
+
+
+def hybrid_search_enabled() -> bool:
+    """Whether sparse vectors are written and queried (HYBRID_SEARCH_ENABLED)."""
+    return os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() != "false"
+
+
+def get_hybrid_alpha() -> float:
+    """Weight of dense scores in hybrid queries (HYBRID_SEARCH_ALPHA, 0.0 to 1.0)."""
+    return min(1.0, max(0.0, float(os.getenv("HYBRID_SEARCH_ALPHA", "0.5"))))
+
+
+def hybrid_scale(
+    dense: List[float],
+    sparse: SparseVector,
+    alpha: float
+) -> Tuple[List[float], SparseVector]:
+    """
+    Weight a dense and a sparse query vector for a dot-product hybrid query.
+
+    Args:
+        dense: Dense query embedding
+        sparse: Sparse query vector
+        alpha: Weight of the dense vector (1.0 = dense only, 0.0 = sparse only)
+
+    Returns:
+        (scaled dense vector, scaled sparse vector)
+    """
+    return (
+        [value * alpha for value in dense],
+        {"indices": sparse["indices"], "values": [value * (1 - alpha) for value in sparse["values"]]}
+    )
+
+
+class BM25Encoder:
+    """
+    Encodes text into BM25 sparse vectors for hybrid search.
+
+    Terms are hashed to 32-bit indices, so no vocabulary has to be stored.
+    Document vectors carry the BM25 term-frequency component; query vectors
+    carry IDF weights normalized to sum to 1, so their dot product is the BM25
+    score on a scale comparable to the dense cosine similarity. Corpus
+    statistics (document frequencies and lengths) are persisted in SQLite.
+    """
+
+    _instance: Optional['BM25Encoder'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the encoder with environment variables.
+
+        Args:
+            path: SQLite file path for corpus statistics (defaults to BM25_STATS_PATH)
+            k1: Term-frequency saturation
+            b: Document length normalization
+        """
+        self.path = path or os.getenv("BM25_STATS_PATH", ".cache/bm25_stats.sqlite3")
+        self.k1 = k1
+        self.b = b
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS terms (term INTEGER PRIMARY KEY, df INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS corpus (id INTEGER PRIMARY KEY CHECK (id = 0), "
+            "num_docs INTEGER NOT NULL, total_length INTEGER NOT NULL)"
+        )
+        self._conn.execute("INSERT OR IGNORE INTO corpus (id, num_docs, total_length) VALUES (0, 0, 0)")
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls) -> 'BM25Encoder':
+        """Get singleton instance of BM25Encoder."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Split text into lowercase terms.
+
+        Compound identifiers are kept whole and also contribute their parts,
+        so "ERR-4012" matches both "err-4012" and "4012".
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            Terms with stopwords removed
+        """
+        terms = []
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            if token in _STOPWORDS:
+                continue
+            terms.append(token)
+            if not token.isalnum():
+                terms.extend(part for part in _PART_PATTERN.findall(token) if part not in _STOPWORDS)
+        return terms
+
+    @staticmethod
+    def term_index(term: str) -> int:
+        """Hash a term to a 32-bit sparse index."""
+        return zlib.crc32(term.encode('utf-8'))
+
+    def encode_documents(self, texts: List[str]) -> List[SparseVector]:
+        """
+        Encode document chunks and add them to the corpus statistics.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            One sparse vector per text (empty when a text has no terms)
+        """
+        counts, lengths, document_frequencies = self._term_counts(texts)
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                document_frequencies.items()
+            )
+            self._conn.execute(
+                "UPDATE corpus SET num_docs = num_docs + ?, total_length = total_length + ? WHERE id = 0",
+                (len(texts), sum(lengths))
+            )
+            self._conn.commit()
+            num_docs, total_length = self._corpus_stats()
+
+        avg_length = total_length / num_docs if num_docs else 1.0
+        vectors = []
+        for count, length in zip(counts, lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+            indices = list(count.keys())
+            vectors.append({
+                "indices": indices,
+                "values": [count[index] / (count[index] + norm) for index in indices]
+            })
+        return vectors
+
+    def remove_documents(self, texts: List[str]) -> None:
+        """
+        Remove deleted document chunks from the corpus statistics.
+
+        Counts never drop below zero, so chunks stored while hybrid search was
+        disabled (and never counted) cannot corrupt the statistics.
+
+        Args:
+            texts: Texts of the deleted chunks, as passed to encode_documents
+        """
+        if not texts:
+            return
+        _, lengths, document_frequencies = self._term_counts(texts)
+
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE terms SET df = df - ? WHERE term = ?",
+                [(df, term) for term, df in document_frequencies.items()]
+            )
+            self._conn.executemany(
+                "DELETE FROM terms WHERE term = ? AND df <= 0",
+                [(term,) for term in document_frequencies]
+            )
+            self._conn.execute(
+                "UPDATE corpus SET num_docs = MAX(num_docs - ?, 0), "
+                "total_length = MAX(total_length - ?, 0) WHERE id = 0",
+                (len(texts), sum(lengths))
+            )
+            self._conn.commit()
+
+    def encode_query(self, text: str) -> SparseVector:
+        """
+        Encode a query as normalized IDF weights of its terms.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Sparse query vector (empty when the query has no known terms)
+        """
+        indices = list(dict.fromkeys(self.term_index(term) for term in self.tokenize(text)))
+        if not indices:
+            return {"indices": [], "values": []}
+
+        with self._lock:
+            num_docs, _ = self._corpus_stats()
+            placeholders = ",".join("?" * len(indices))
+            document_frequencies = dict(self._conn.execute(
+                f"SELECT term, df FROM terms WHERE term IN ({placeholders})", indices
+            ).fetchall())
+
+        # Terms absent from the corpus cannot match, so they are dropped
+        weights = {}
+        for index in indices:
+            df = document_frequencies.get(index, 0)
+            if df:
+                weights[index] = self._idf(num_docs, df)
+
+        total = sum(weights.values())
+        if not total:
+            return {"indices": [], "values": []}
+        return {"indices": list(weights), "values": [weight / total for weight in weights.values()]}
+
+    def clear(self) -> None:
+        """Forget the corpus statistics (e.g. after the index was wiped)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM terms")
+            self._conn.execute("UPDATE corpus SET num_docs = 0, total_length = 0 WHERE id = 0")
+            self._conn.commit()
+
+    def _term_counts(self, texts: List[str]) -> Tuple[List[Counter], List[int], Counter]:
+        """Term counts and length of each text, and the number of texts containing each term."""
+        counts = [Counter(self.term_index(term) for term in self.tokenize(text)) for text in texts]
+        lengths = [sum(count.values()) for count in counts]
+
+        document_frequencies: Counter = Counter()
+        for count in counts:
+            document_frequencies.update(count.keys())
+        return counts, lengths, document_frequencies
+
+    def _corpus_stats(self) -> Tuple[int, int]:
+        """Number of documents and total term count of the corpus."""
+        return self._conn.execute("SELECT num_docs, total_length FROM corpus WHERE id = 0").fetchone()
+
+    @staticmethod
+    def _idf(num_docs: int, df: int) -> float:
+        """BM25 inverse document frequency (Lucene variant, always positive)."""
+        return math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+
+# Convenience function to get encoder instance
+def get_sparse_encoder() -> BM25Encoder:
+    """Get singleton instance of BM25Encoder."""
+    return BM25Encoder.get_instance()
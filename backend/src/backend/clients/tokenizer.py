@@ -0,0 +1,54 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+
+
+# Rough characters-per-token ratio used when the tokenizer cannot be loaded
+CHARS_PER_TOKEN = 4
+
+
+def get_tokenizer(model: Optional[str] = None) -> Optional[tiktoken.Encoding]:
+    """
+    Get the tiktoken encoding for an embedding model.
+
+    Args:
+        model: Embedding model name (defaults to DEFAULT_EMBEDDING_MODEL)
+
+    Returns:
+        The encoding, or None if it cannot be loaded (e.g. no network to fetch the BPE file)
+    """
+    model = model or os.getenv("DEFAULT_EMBEDDING_MODEL", "text-embedding-3-large")
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        name = "cl100k_base"
+    return _load_encoding(name)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str) -> Optional[tiktoken.Encoding]:
+    """Load a named encoding once, returning None on failure."""
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"Warning: Could not load tokenizer {name}, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens a text costs for an embedding model.
+
+    Args:
+        text: Text to measure
+        model: Embedding model name (defaults to DEFAULT_EMBEDDING_MODEL)
+
+    Returns:
+        Number of tokens (estimated from length if no tokenizer is available)
+    """
+    tokenizer = get_tokenizer(model)
+    if tokenizer is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    return len(tokenizer.encode(text, disallowed_special=()))
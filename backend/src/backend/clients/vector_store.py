@@ -0,0 +1,209 @@
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from backend.clients.pinecone_client import get_pinecone_client
+
+# Namespaces partition the index per tenant or collection; "" is the default namespace
+_NAMESPACE_PATTERN = re.compile(r'^[A-Za-z0-9_-]{0,64}$')
+
+
+def validate_namespace(namespace: Optional[str]) -> str:
+    """
+    Check a namespace name.
+
+    Args:
+        namespace: Namespace name, or None for the default namespace
+
+    Returns:
+        The namespace ("" for the default namespace)
+
+    Raises:
+        ValueError: If the name is not 1-64 letters, digits, underscores or hyphens
+    """
+    namespace = namespace or ""
+    if not _NAMESPACE_PATTERN.match(namespace):
+        raise ValueError(
+            f"Invalid namespace {namespace!r}: use up to 64 letters, digits, underscores or hyphens"
+        )
+    return namespace
+
+
+class VectorMatch(NamedTuple):
+    """A single query result."""
+    id: str
+    score: float
+    metadata: Dict[str, Any]
+
+
+class VectorStore(ABC):
+    """
+    Interface shared by the vector database backends.
+
+    Every operation works within one namespace ("" by default). Query filters
+    use Pinecone's metadata filter language: {"field": value} or
+    {"field": {"$op": value}} with $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte
+    and $exists, combined with $and and $or. A condition on a list field
+    matches if any element does.
+    """
+
+    @abstractmethod
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        """
+        Insert or replace vectors.
+
+        Args:
+            vectors: Dicts with "id", "values" and "metadata" keys, plus an optional
+                "sparse_values" dict of "indices" and "values" for hybrid search
+            namespace: Namespace to write to
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        sparse_vector: Optional[Dict[str, list]] = None,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[VectorMatch]:
+        """
+        Find the vectors with the highest dot product to a query vector.
+
+        With a sparse vector, the score is the sum of the dense and sparse dot
+        products (weight the two beforehand, e.g. with hybrid_scale).
+
+        Args:
+            vector: Query embedding
+            top_k: Number of matches to return
+            sparse_vector: Optional sparse query vector ("indices" and "values")
+            namespace: Namespace to search
+            filter: Optional metadata filter
+
+        Returns:
+            Matches ordered by descending score
+        """
+
+    @abstractmethod
+    def update_metadata(self, vector_id: str, metadata: Dict[str, Any], namespace: str = "") -> None:
+        """
+        Set metadata fields of a stored vector, keeping its other fields.
+
+        Args:
+            vector_id: Vector id
+            metadata: Fields to set
+            namespace: Namespace holding the vector
+        """
+
+    @abstractmethod
+    def fetch_metadata(self, ids: List[str], namespace: str = "") -> Dict[str, Dict[str, Any]]:
+        """
+        Get the metadata of stored vectors.
+
+        Args:
+            ids: Vector ids
+            namespace: Namespace holding the vectors
+
+        Returns:
+            Metadata by vector id (ids that are not stored are left out)
+        """
+
+    @abstractmethod
+    def delete(self, ids: List[str], namespace: str = "") -> None:
+        """
+        Delete vectors by id.
+
+        Args:
+            ids: Vector ids to delete
+            namespace: Namespace holding the vectors
+        """
+
+    @abstractmethod
+    def delete_all(self) -> None:
+        """Delete every vector in every namespace."""
+
+
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by the Pinecone index of PineconeClient."""
+
+    def __init__(self):
+        """Connect to (or create) the Pinecone index."""
+        dimension = int(os.getenv("EMBEDDING_DIMENSION", "1024"))
+        self.index = get_pinecone_client().get_or_create_index(dimension=dimension)
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        self.index.upsert(vectors=vectors, namespace=namespace)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        sparse_vector: Optional[Dict[str, list]] = None,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[VectorMatch]:
+        # Pinecone rejects empty sparse vectors
+        if sparse_vector is not None and not sparse_vector["indices"]:
+            sparse_vector = None
+        results = self.index.query(
+            vector=vector,
+            sparse_vector=sparse_vector,
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter or None,
+            include_metadata=True
+        )
+        return [
+            VectorMatch(id=match.id, score=match.score, metadata=match.metadata or {})
+            for match in results.matches or []
+        ]
+
+    def update_metadata(self, vector_id: str, metadata: Dict[str, Any], namespace: str = "") -> None:
+        self.index.update(id=vector_id, set_metadata=metadata, namespace=namespace)
+
+    def fetch_metadata(self, ids: List[str], namespace: str = "") -> Dict[str, Dict[str, Any]]:
+        metadata = {}
+        # Fetch ids travel in the URL, so keep requests short
+        for i in range(0, len(ids), 100):
+            response = self.index.fetch(ids=ids[i:i + 100], namespace=namespace)
+            for vector_id, vector in (response.vectors or {}).items():
+                metadata[vector_id] = vector.metadata or {}
+        return metadata
+
+    def delete(self, ids: List[str], namespace: str = "") -> None:
+        self.index.delete(ids=ids, namespace=namespace)
+
+    def delete_all(self) -> None:
+        # delete_all only applies to one namespace at a time
+        namespaces = set(self.index.describe_index_stats().namespaces or {}) | {""}
+        for namespace in namespaces:
+            self.index.delete(delete_all=True, namespace=namespace)
+
+
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """
+    Get the configured vector store (VECTOR_STORE=pinecone or local).
+
+    Returns:
+        Singleton VectorStore instance
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = os.getenv("VECTOR_STORE", "pinecone").lower()
+                if backend == "pinecone":
+                    _store = PineconeVectorStore()
+                elif backend == "local":
+                    from backend.clients.local_vector_store import LocalVectorStore
+
+                    _store = LocalVectorStore()
+                else:
+                    raise ValueError(f"Unsupported VECTOR_STORE: {backend}")
+    return _store
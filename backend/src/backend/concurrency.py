@@ -0,0 +1,159 @@
+"""
+Bounded executors for running blocking work off the event loop.
+
+The crew kickoff, the synchronous OpenAI/Pinecone clients and document parsing
+all block. Each kind of work gets its own thread pool so a burst of uploads
+cannot starve question answering, and each pool rejects new work once its
+queue is full instead of letting requests pile up without limit.
+"""
+
+import os
+import asyncio
+import threading
+import contextvars
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a bounded executor has no free worker or queue slot."""
+
+
+class BoundedExecutor:
+    """Thread pool with a limit on running plus queued jobs."""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        """
+        Initialize the executor.
+
+        Args:
+            name: Pool name, used for thread names and error messages
+            max_workers: Number of worker threads
+            max_queue: Number of jobs allowed to wait for a free worker
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running or queued."""
+        return self._in_flight
+
+    def free_slots(self) -> int:
+        """Number of jobs that can still be accepted."""
+        return max(0, self.max_workers + self.max_queue - self._in_flight)
+
+    def is_saturated(self) -> bool:
+        """Whether a new job would be rejected."""
+        return self.free_slots() == 0
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Submit a blocking callable without waiting for it (fire-and-forget work).
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Future for the callable's result
+
+        Raises:
+            ExecutorSaturatedError: If the pool and its queue are full
+        """
+        self._acquire()
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking callable in the pool and await its result.
+
+        The caller's context variables are copied into the worker thread.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ExecutorSaturatedError: If the pool and its queue are full
+        """
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, func, *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self._release()
+
+    def _acquire(self) -> None:
+        """Reserve a slot or raise if the pool is full."""
+        with self._lock:
+            if self.is_saturated():
+                raise ExecutorSaturatedError(
+                    f"The {self.name} pool is busy ({self._in_flight} jobs in flight), try again shortly"
+                )
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        """Free a slot taken by _acquire."""
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool limits and current load."""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+        }
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+# name -> (workers env var, default workers, queue env var, default queue)
+_EXECUTOR_SETTINGS = {
+    "crew": ("CREW_MAX_WORKERS", 8, "CREW_MAX_QUEUE", 32),
+    "search": ("SEARCH_MAX_WORKERS", 16, "SEARCH_MAX_QUEUE", 64),
+    "ingest": ("INGEST_MAX_WORKERS", 2, "INGEST_MAX_QUEUE", 64),
+}
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """
+    Get the shared executor for a kind of work.
+
+    Args:
+        name: One of "crew", "search" or "ingest"
+
+    Returns:
+        The BoundedExecutor for that pool, created on first use
+    """
+    with _executors_lock:
+        executor: Optional[BoundedExecutor] = _executors.get(name)
+        if executor is None:
+            workers_var, default_workers, queue_var, default_queue = _EXECUTOR_SETTINGS[name]
+            executor = BoundedExecutor(
+                name=name,
+                max_workers=int(os.getenv(workers_var, str(default_workers))),
+                max_queue=int(os.getenv(queue_var, str(default_queue))),
+            )
+            _executors[name] = executor
+        return executor
@@ -1,12 +1,30 @@
+import os
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from crewai.utilities.llm_utils import create_llm
+from typing import List, Optional
 
 from backend.tools.pinecone_search import PineconeSearchTool
 from backend.tools.web_search import WebSearchTool
 
 
+def create_streaming_llm(model: Optional[str] = None):
+    """
+    Create an LLM, streaming tokens unless LLM_STREAMING=false.
+
+    Args:
+        model: Model name (defaults to the model configured in the environment)
+
+    Returns:
+        CrewAI LLM instance
+    """
+    llm = create_llm(model)
+    if os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes"):
+        llm.stream = True
+    return llm
+
+
 @CrewBase
 class Backend():
     """Backend crew for RAG-powered question answering"""
@@ -14,15 +32,27 @@ class Backend():
     agents: List[BaseAgent]
     tasks: List[Task]
 
+    def __init__(self, model: Optional[str] = None):
+        """
+        Args:
+            model: LLM model for the agent (defaults to the model configured in the environment)
+        """
+        self.model = model
+
     @agent
     def rag_assistant(self) -> Agent:
         """RAG assistant agent with Pinecone search and web search tools"""
         return Agent(
             config=self.agents_config['rag_assistant'], # type: ignore[index]
             tools=[PineconeSearchTool(), WebSearchTool()],
+            llm=self._llm(),
             verbose=True
         )
 
+    def _llm(self):
+        """LLM for the crew's model, streaming tokens unless LLM_STREAMING=false"""
+        return create_streaming_llm(self.model)
+
     @task
     def answer_question_task(self) -> Task:
         """Task to answer user questions using RAG or web search"""
@@ -37,5 +67,7 @@ class Backend():
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
+            # Crews are reused across requests (see crew_pool), so tool results must not be cached
+            cache=False,
             verbose=True,
         )
@@ -0,0 +1,119 @@
+"""
+Pool of pre-built crews keyed by model.
+
+Building a crew parses the YAML configs and creates the agent, its LLM and its
+tools. Crews are not safe to kick off concurrently, so each kickoff checks out
+an idle crew for its model (building one only if none is idle) and returns it
+afterwards. The model is passed to the crew's LLM directly, so concurrent
+requests can use different models without touching process-wide settings.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def get_default_model() -> str:
+    """Model used when a request does not choose one (DEFAULT_LLM_MODEL)."""
+    return os.getenv("DEFAULT_LLM_MODEL", "openai/gpt-4o")
+
+
+class CrewPool:
+    """Idle crews per model, reused across requests."""
+
+    _instance: Optional['CrewPool'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_idle_per_model: Optional[int] = None):
+        """
+        Initialize the pool with environment variables.
+
+        Args:
+            max_idle_per_model: Idle crews kept per model (defaults to CREW_POOL_MAX_IDLE)
+        """
+        self.max_idle_per_model = max_idle_per_model or int(
+            os.getenv("CREW_POOL_MAX_IDLE", os.getenv("CREW_MAX_WORKERS", "8"))
+        )
+        self._idle: Dict[str, List[Any]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+        self.reused = 0
+        self.built = 0
+
+    @classmethod
+    def get_instance(cls) -> 'CrewPool':
+        """Get singleton instance of CrewPool."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @contextmanager
+    def checkout(self, model: Optional[str] = None) -> Iterator[Any]:
+        """
+        Use a crew for one kickoff, returning it to the pool afterwards.
+
+        Args:
+            model: LLM model (defaults to DEFAULT_LLM_MODEL)
+
+        Yields:
+            Crew for the model, used by no one else until the block exits
+        """
+        model = model or get_default_model()
+        crew = self._acquire(model)
+        try:
+            yield crew
+        finally:
+            self._release(model, crew)
+
+    def prewarm(self, model: Optional[str] = None, count: int = 1) -> None:
+        """
+        Build crews ahead of the first requests.
+
+        Args:
+            model: LLM model (defaults to DEFAULT_LLM_MODEL)
+            count: Number of idle crews to have ready
+        """
+        model = model or get_default_model()
+        with self._lock:
+            missing = min(count, self.max_idle_per_model) - len(self._idle[model])
+        for _ in range(max(0, missing)):
+            self._release(model, self._build(model))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return reuse counters and idle crews per model."""
+        with self._lock:
+            idle = {model: len(crews) for model, crews in self._idle.items()}
+        return {"reused": self.reused, "built": self.built, "idle": idle}
+
+    def _acquire(self, model: str) -> Any:
+        """Take an idle crew for the model, or build one."""
+        with self._lock:
+            if self._idle[model]:
+                self.reused += 1
+                return self._idle[model].pop()
+        return self._build(model)
+
+    def _release(self, model: str, crew: Any) -> None:
+        """Return a crew to the pool, dropping it if enough are idle already."""
+        with self._lock:
+            if len(self._idle[model]) < self.max_idle_per_model:
+                self._idle[model].append(crew)
+
+    def _build(self, model: str) -> Any:
+        """Build a new crew for the model."""
+        from backend.crew import Backend
+
+        crew = Backend(model=model).crew()
+        with self._lock:
+            self.built += 1
+        return crew
+
+
+# Convenience function to get pool instance
+def get_crew_pool() -> CrewPool:
+    """Get singleton instance of CrewPool."""
+    return CrewPool.get_instance()
@@ -0,0 +1,126 @@
+"""
+Fast-path routing for /api/ask.
+
+The crew's ReAct agent needs at least two or three LLM round trips per answer
+(choose a tool, call it, answer). Most questions do not need that loop, so a
+deterministic classifier picks one of three routes before anything runs:
+
+- direct: nothing in the knowledge base is close to the question, and it does
+  not ask about documents or current events, so one LLM call answers it.
+- rag: the closest knowledge-base chunk is similar enough that the retrieved
+  context can be put straight into one LLM call.
+- agent: everything else (ambiguous similarity, or questions that may need web
+  search) goes through the full crew.
+
+The classifier reads the top score of the knowledge-base search the request has
+already made for its sources, so routing adds no vector query.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+
+ROUTE_DIRECT = "direct"
+ROUTE_RAG = "rag"
+ROUTE_AGENT = "agent"
+
+# Questions about current events need the web search tool
+_FRESHNESS_PATTERN = re.compile(
+    r"\b(latest|current(ly)?|today|tonight|yesterday|tomorrow|this (week|month|year)|"
+    r"recent(ly)?|news|right now|price|stock|weather|score)\b",
+    re.IGNORECASE
+)
+# Questions that refer to uploaded content should never skip retrieval
+_DOCUMENT_PATTERN = re.compile(
+    r"\b(document|file|pdf|upload(ed)?|attachment|page|section|chapter|"
+    r"according to|the (report|manual|paper|contract|spec))s?\b",
+    re.IGNORECASE
+)
+
+_prompts: Optional[Dict[str, str]] = None
+
+
+def fast_path_enabled() -> bool:
+    """Whether questions are routed before running the crew (FAST_PATH_ENABLED)."""
+    return os.getenv("FAST_PATH_ENABLED", "true").lower() != "false"
+
+
+def needs_fresh_information(question: str) -> bool:
+    """Whether a question asks about current events, which the knowledge base cannot answer."""
+    return _FRESHNESS_PATTERN.search(question) is not None
+
+
+def classify_question(question: str, search_results: Dict[str, Any]) -> str:
+    """
+    Pick the cheapest route that can answer a question.
+
+    With hybrid search enabled, the thresholds apply to the alpha-weighted
+    dense + sparse score of the closest chunk.
+
+    Args:
+        question: User's question
+        search_results: Knowledge-base search results for the question
+            (from PineconeSearchTool.search_with_metadata)
+
+    Returns:
+        ROUTE_DIRECT, ROUTE_RAG or ROUTE_AGENT
+    """
+    if needs_fresh_information(question):
+        return ROUTE_AGENT
+
+    rag_threshold = float(os.getenv("FAST_PATH_RAG_THRESHOLD", "0.5"))
+    direct_threshold = float(os.getenv("FAST_PATH_DIRECT_THRESHOLD", "0.3"))
+
+    # Reranking reorders the results but keeps each one's retrieval score
+    results = search_results.get("results", [])
+    similarity = max((result["score"] for result in results), default=0.0)
+
+    if similarity >= rag_threshold:
+        return ROUTE_RAG
+    if similarity < direct_threshold and not _DOCUMENT_PATTERN.search(question):
+        return ROUTE_DIRECT
+    return ROUTE_AGENT
+
+
+def build_messages(route: str, question: str, results: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    Build the chat messages for a single-call route.
+
+    Args:
+        route: ROUTE_DIRECT or ROUTE_RAG
+        question: User's question
+        results: Search results (used by ROUTE_RAG)
+
+    Returns:
+        System and user messages
+    """
+    prompts = _get_prompts()
+    if route == ROUTE_RAG:
+        context = "\n\n".join(_format_result(result) for result in results)
+        prompt = prompts["rag"].format(question=question, context=context)
+    else:
+        prompt = prompts["direct"].format(question=question)
+
+    return [
+        {"role": "system", "content": prompts["system"]},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    """Format one search result as a context block."""
+    page_text = f", Page: {result['page_number']}" if result.get("page_number") is not None else ""
+    return f"[Source: {result['source_file']}{page_text}]\n{result['text']}"
+
+
+def _get_prompts() -> Dict[str, str]:
+    """Load the prompt templates from config/fast_path.yaml once."""
+    global _prompts
+    if _prompts is None:
+        with open(Path(__file__).parent / "config" / "fast_path.yaml", encoding="utf-8") as f:
+            _prompts = yaml.safe_load(f)
+    return _prompts
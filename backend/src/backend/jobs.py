@@ -0,0 +1,230 @@
+"""
+Background ingestion jobs for /api/upload.
+
+Uploaded files are written to a persistent upload directory and recorded as
+jobs in a small SQLite database. Jobs run on the "ingest" executor, report
+progress (pages parsed, chunks embedded, vectors upserted) as they go, and are
+picked up again after a restart if they had not finished.
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import threading
+import traceback
+from typing import Any, Dict, Optional
+
+from backend.concurrency import ExecutorSaturatedError, get_executor
+from backend.tools.document_processor import DocumentProcessorTool
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+PROGRESS_FIELDS = ("pages_parsed", "chunks_total", "chunks_embedded", "vectors_upserted")
+
+
+class IngestJobQueue:
+    """SQLite-backed queue of document ingestion jobs."""
+
+    _instance: Optional['IngestJobQueue'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[str] = None, upload_dir: Optional[str] = None):
+        """
+        Initialize the job queue with environment variables.
+
+        Args:
+            db_path: SQLite file path (defaults to INGEST_JOB_DB_PATH)
+            upload_dir: Directory holding files waiting to be ingested (defaults to UPLOAD_DIR)
+        """
+        self.db_path = db_path or os.getenv("INGEST_JOB_DB_PATH", ".cache/ingest_jobs.sqlite3")
+        self.upload_dir = upload_dir or os.getenv("UPLOAD_DIR", ".cache/uploads")
+
+        for directory in (os.path.dirname(self.db_path), self.upload_dir):
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, filename TEXT NOT NULL, file_path TEXT NOT NULL, "
+            "status TEXT NOT NULL, pages_parsed INTEGER NOT NULL DEFAULT 0, "
+            "chunks_total INTEGER NOT NULL DEFAULT 0, chunks_embedded INTEGER NOT NULL DEFAULT 0, "
+            "vectors_upserted INTEGER NOT NULL DEFAULT 0, message TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        columns = [column[1] for column in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "namespace" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls) -> 'IngestJobQueue':
+        """Get singleton instance of IngestJobQueue."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def enqueue(self, filename: str, content: bytes, namespace: str = "") -> str:
+        """
+        Store an uploaded file and queue it for ingestion.
+
+        Args:
+            filename: Original filename
+            content: Raw file bytes
+            namespace: Namespace to store the document in
+
+        Returns:
+            The new job id
+
+        Raises:
+            ExecutorSaturatedError: If the ingest pool cannot accept another job
+        """
+        job_id = uuid.uuid4().hex
+        file_ext = os.path.splitext(filename)[1].lower()
+        file_path = os.path.join(self.upload_dir, f"{job_id}{file_ext}")
+        with open(file_path, 'wb') as f:
+            f.write(content)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, filename, namespace, file_path, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, namespace, file_path, JOB_QUEUED, now, now)
+            )
+            self._conn.commit()
+
+        try:
+            get_executor("ingest").submit(self._process, job_id)
+        except Exception as e:
+            self._finish(job_id, JOB_FAILED, str(e))
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            raise
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status and progress of a job.
+
+        Args:
+            job_id: Job id returned by enqueue
+
+        Returns:
+            Job record as a dictionary, or None if the job does not exist
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, filename, namespace, status, pages_parsed, chunks_total, chunks_embedded, "
+                "vectors_upserted, message, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def resume(self) -> int:
+        """
+        Re-submit jobs that were queued or running when the process stopped.
+
+        Returns:
+            Number of jobs resubmitted
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, file_path FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+
+        resumed = 0
+        for row in rows:
+            if not os.path.exists(row["file_path"]):
+                self._finish(row["id"], JOB_FAILED, "Uploaded file is missing after restart")
+                continue
+            self._update(row["id"], status=JOB_QUEUED, pages_parsed=0, chunks_total=0,
+                         chunks_embedded=0, vectors_upserted=0)
+            try:
+                get_executor("ingest").submit(self._process, row["id"])
+            except ExecutorSaturatedError as e:
+                self._finish(row["id"], JOB_FAILED, str(e))
+                continue
+            resumed += 1
+        return resumed
+
+    def _process(self, job_id: str) -> None:
+        """Run one job on an ingest worker thread."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename, namespace, file_path FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return
+
+        self._update(job_id, status=JOB_RUNNING)
+        print(f"Processing file: {row['filename']} (job {job_id})")
+
+        try:
+            # The processor deletes the file once it has been ingested
+            result = DocumentProcessorTool()._run(
+                file_path=row["file_path"],
+                original_filename=row["filename"],
+                namespace=row["namespace"],
+                progress=lambda field, amount: self._add_progress(job_id, field, amount)
+            )
+            if result.startswith("Error processing document"):
+                self._finish(job_id, JOB_FAILED, result)
+                print(f"ERROR: {row['filename']} - {result}")
+            else:
+                self._finish(job_id, JOB_COMPLETED, result)
+                print(f"SUCCESS: {row['filename']} - {result}")
+        except Exception as e:
+            self._finish(job_id, JOB_FAILED, f"Error processing {row['filename']}: {str(e)}")
+            traceback.print_exc()
+        finally:
+            # Failed documents are not deleted by the processor
+            try:
+                if os.path.exists(row["file_path"]):
+                    os.remove(row["file_path"])
+            except OSError:
+                pass
+
+    def _add_progress(self, job_id: str, field: str, amount: int) -> None:
+        """Increment one of the job's progress counters."""
+        if field not in PROGRESS_FIELDS:
+            raise ValueError(f"Unknown progress field: {field}")
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {field} = {field} + ?, updated_at = ? WHERE id = ?",
+                (amount, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def _finish(self, job_id: str, status: str, message: str) -> None:
+        """Mark a job as completed or failed."""
+        self._update(job_id, status=status, message=message)
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        """Set columns on a job row."""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ?",
+                (*fields.values(), time.time(), job_id)
+            )
+            self._conn.commit()
+
+
+# Convenience function to get queue instance
+def get_ingest_queue() -> IngestJobQueue:
+    """Get singleton instance of IngestJobQueue."""
+    return IngestJobQueue.get_instance()
@@ -0,0 +1,193 @@
+"""
+Application startup and knowledge base administration.
+
+Startup no longer wipes the index: documents, manifests and BM25 statistics
+survive restarts, and the knowledge base is only reset by the admin endpoint or
+by setting RESET_ON_STARTUP=true. Warm-up runs in the background after the app
+starts serving, so /health answers immediately and reports readiness while
+connections are opened, crewai is imported and crews are pre-built.
+"""
+
+import os
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+class Readiness:
+    """Warm-up status of the components needed to answer questions."""
+
+    _instance: Optional['Readiness'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        """Initialize with nothing warmed up yet."""
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'Readiness':
+        """Get singleton instance of Readiness."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def set(self, component: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Record the status of a component.
+
+        Args:
+            component: Component name
+            status: STATUS_PENDING, STATUS_READY or STATUS_FAILED
+            error: Failure message, if any
+        """
+        entry: Dict[str, Any] = {"status": status}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._components[component] = entry
+
+    def finish(self) -> None:
+        """Mark warm-up as done (whether or not every component succeeded)."""
+        self.finished_at = time.time()
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up finished and every component is ready."""
+        with self._lock:
+            components = list(self._components.values())
+        return self.finished_at is not None and all(c["status"] == STATUS_READY for c in components)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the overall status and the status of each component."""
+        with self._lock:
+            components = {name: dict(entry) for name, entry in self._components.items()}
+        if self.finished_at is None:
+            status = "starting"
+        elif all(c["status"] == STATUS_READY for c in components.values()):
+            status = "ready"
+        else:
+            status = "degraded"
+        snapshot: Dict[str, Any] = {"status": status, "components": components}
+        if self.finished_at is not None:
+            snapshot["warmup_seconds"] = round(self.finished_at - self.started_at, 3)
+        return snapshot
+
+
+# Convenience function to get readiness instance
+def get_readiness() -> Readiness:
+    """Get singleton instance of Readiness."""
+    return Readiness.get_instance()
+
+
+def reset_knowledge_base() -> None:
+    """
+    Delete every document from the knowledge base.
+
+    Clears the vectors, the ingest manifests, BM25 statistics and near-duplicate
+    index that describe them, and the answers cached from them.
+    """
+    from backend.answer_cache import get_answer_cache
+    from backend.clients.sparse_encoder import get_sparse_encoder
+    from backend.clients.vector_store import get_vector_store
+    from backend.tools.document_manifest import get_manifest_store
+    from backend.tools.near_duplicates import get_near_duplicate_index
+
+    get_vector_store().delete_all()
+    get_manifest_store().clear()
+    get_sparse_encoder().clear()
+    get_near_duplicate_index().clear()
+    get_answer_cache().clear()
+
+
+def _import_crewai_modules() -> None:
+    """Import the modules that load crewai, so the first request does not pay for it."""
+    import backend.crew  # noqa: F401
+    import backend.jobs  # noqa: F401
+    import backend.streaming  # noqa: F401
+
+
+def _warm_vector_store() -> None:
+    """Open the vector store (connects to Pinecone or loads the local index)."""
+    from backend.clients.vector_store import get_vector_store
+
+    get_vector_store()
+
+
+def _warm_openai() -> None:
+    """Create the OpenAI client."""
+    from backend.clients.openai_client import get_openai_client
+
+    get_openai_client()
+
+
+async def _warm(readiness: Readiness, component: str, func: Callable[..., Any], *args: Any,
+                pool: str = "search", **kwargs: Any) -> bool:
+    """
+    Run one warm-up step on a bounded executor and record its status.
+
+    Returns:
+        True if the step succeeded
+    """
+    from backend.concurrency import get_executor
+
+    readiness.set(component, STATUS_PENDING)
+    try:
+        await get_executor(pool).run(func, *args, **kwargs)
+    except Exception as e:
+        readiness.set(component, STATUS_FAILED, str(e))
+        print(f"⚠️ Warning: Could not warm up {component}: {e}")
+        return False
+    readiness.set(component, STATUS_READY)
+    return True
+
+
+async def warm_up() -> None:
+    """
+    Prepare the app in the background after it starts serving.
+
+    Optionally resets the knowledge base (RESET_ON_STARTUP), then connects to the
+    vector store and OpenAI and imports crewai concurrently, resumes interrupted
+    ingestion jobs and pre-builds CREW_POOL_PREWARM crews for the default model.
+    """
+    readiness = get_readiness()
+
+    if os.getenv("RESET_ON_STARTUP", "false").lower() == "true":
+        print("🔄 Resetting knowledge base on startup (RESET_ON_STARTUP=true)...")
+        if await _warm(readiness, "reset", reset_knowledge_base):
+            print("✅ Knowledge base reset complete")
+
+    await asyncio.gather(
+        _warm(readiness, "vector_store", _warm_vector_store),
+        _warm(readiness, "openai", _warm_openai),
+        _warm(readiness, "crewai", _import_crewai_modules),
+    )
+
+    # Pick up ingestion jobs interrupted by the previous shutdown
+    def resume_jobs() -> None:
+        from backend.jobs import get_ingest_queue
+
+        resumed = get_ingest_queue().resume()
+        if resumed:
+            print(f"🔁 Resumed {resumed} pending ingestion job(s)")
+
+    await _warm(readiness, "ingest_jobs", resume_jobs)
+
+    # Build crews for the default model before the first questions arrive
+    from backend.crew_pool import get_crew_pool
+
+    prewarm = int(os.getenv("CREW_POOL_PREWARM", "2"))
+    if await _warm(readiness, "crew_pool", get_crew_pool().prewarm, count=prewarm, pool="crew"):
+        print(f"✅ Pre-warmed {prewarm} crew(s)")
+
+    readiness.finish()
+    print(f"✅ Warm-up finished: {readiness.snapshot()['status']}")
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import sys
+import asyncio
 import warnings
 
 from datetime import datetime
@@ -66,3 +67,21 @@ def test():
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+
+def ask_batch():
+    """
+    Answer a file of questions (one per line) and write the answers as NDJSON.
+
+    Usage: ask_batch <questions file> <output file> [model] [namespace]
+    """
+    from dotenv import load_dotenv
+    from backend.batch import write_batch_answers
+
+    load_dotenv()
+    try:
+        model = sys.argv[3] if len(sys.argv) > 3 else None
+        namespace = sys.argv[4] if len(sys.argv) > 4 else ""
+        failed = asyncio.run(write_batch_answers(sys.argv[1], sys.argv[2], model, namespace))
+    except Exception as e:
+        raise Exception(f"An error occurred while answering the batch: {e}")
+    sys.exit(1 if failed else 0)
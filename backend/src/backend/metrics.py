@@ -0,0 +1,373 @@
+"""
+Prometheus-style metrics and optional OpenTelemetry tracing for the RAG pipeline.
+
+Every stage of ingestion (extract, clean, chunk, embed, upsert) and of answering
+(query_embed, vector_query, rerank, web_search, crew_kickoff, llm_call,
+first_byte, and the whole ask) records its latency in one histogram labelled by stage, and its
+failures in an error counter. Token counts and cache hit/miss counters are
+exported alongside, and GET /metrics renders everything in the Prometheus text
+format.
+
+With OTEL_TRACING_ENABLED=true each timed stage is also an OpenTelemetry span.
+The bounded executors copy the request context into worker threads, so the
+spans of one request (search tool, embedding, vector query, LLM) nest under it.
+Spans are exported over OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set and the
+tracing extra is installed.
+"""
+
+import os
+import time
+import threading
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Seconds; covers cached lookups (milliseconds) up to multi-minute document ingests
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a label set as {name="value",...}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, keeping integers free of a trailing .0."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        """
+        Initialize the counter.
+
+        Args:
+            name: Metric name
+            description: HELP text
+            labels: Label names
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Amount to add
+            **labels: Label values (all label names are required)
+        """
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> List[str]:
+        """Render the counter in the text exposition format."""
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histogram with fixed buckets and optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name
+            description: HELP text
+            labels: Label names
+            buckets: Upper bounds of the buckets, ascending (+Inf is implied)
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (not cumulative) + overflow, sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value: Observed value
+            **labels: Label values (all label names are required)
+        """
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        """Render the histogram in the text exposition format."""
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    """
+    Accumulates the time spent in each stage of one multi-stage operation.
+
+    Ingestion streams pages through extract -> clean -> chunk lazily, so the
+    stages interleave. Nested measurements are exclusive: time spent in an inner
+    stage (e.g. extracting the page a chunk needs) is not counted for the outer
+    one. Use from a single thread.
+    """
+
+    def __init__(self, metrics: 'Metrics'):
+        """
+        Initialize the timer.
+
+        Args:
+            metrics: Registry the totals are observed into
+        """
+        self._metrics = metrics
+        self._stack: List[str] = []
+        self._failed = False
+        self.totals: Dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Add the time spent in the block to a stage."""
+        self._stack.append(stage)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            # Count the failure once, for the innermost stage it came from
+            if not self._failed:
+                self._failed = True
+                self._metrics.stage_errors.inc(stage=stage)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            self.totals[stage] += elapsed
+            if self._stack:
+                self.totals[self._stack[-1]] -= elapsed
+
+    def iterate(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from an iterable, adding the time spent producing each item to a stage."""
+        iterator = iter(iterable)
+        while True:
+            with self.measure(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def observe(self) -> None:
+        """Record the total of every stage as one observation."""
+        for stage, total in self.totals.items():
+            self._metrics.stage_seconds.observe(max(total, 0.0), stage=stage)
+
+
+class Metrics:
+    """Process-wide metrics registry."""
+
+    _instance: Optional['Metrics'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        """Declare the metrics."""
+        self.stage_seconds = Histogram(
+            "notstuck_stage_duration_seconds",
+            "Latency of pipeline stages (ingestion stages per document, others per call).",
+            labels=("stage",)
+        )
+        self.stage_errors = Counter(
+            "notstuck_stage_errors_total",
+            "Pipeline stage failures.",
+            labels=("stage",)
+        )
+        self.ask_requests = Counter(
+            "notstuck_ask_requests_total",
+            "Questions answered, by route (cache, direct, rag or agent).",
+            labels=("route",)
+        )
+        self.llm_tokens = Counter(
+            "notstuck_llm_tokens_total",
+            "LLM tokens used, by model and kind (prompt or completion).",
+            labels=("model", "kind")
+        )
+        self.embedding_tokens = Counter(
+            "notstuck_embedding_tokens_total",
+            "Tokens sent to the embedding API, by model.",
+            labels=("model",)
+        )
+        self._tracer: Any = None
+        self._tracer_lock = threading.Lock()
+        self._tracing_checked = False
+
+    @classmethod
+    def get_instance(cls) -> 'Metrics':
+        """Get singleton instance of Metrics."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @contextmanager
+    def timed(self, stage: str, **attributes: Any) -> Iterator[None]:
+        """
+        Time a block as one observation of a stage, counting it as an error if it raises.
+
+        Args:
+            stage: Stage name
+            **attributes: Span attributes when tracing is enabled
+        """
+        tracer = self._get_tracer()
+        with ExitStack() as stack:
+            if tracer is not None:
+                stack.enter_context(tracer.start_as_current_span(stage, attributes=attributes))
+            start = time.perf_counter()
+            try:
+                yield
+            except Exception:
+                self.stage_errors.inc(stage=stage)
+                raise
+            finally:
+                self.stage_seconds.observe(time.perf_counter() - start, stage=stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record a stage latency measured elsewhere."""
+        self.stage_seconds.observe(seconds, stage=stage)
+
+    def stage_timer(self) -> StageTimer:
+        """Create a timer for the interleaved stages of one operation."""
+        return StageTimer(self)
+
+    def render(self) -> str:
+        """Render every metric, plus cache counters, in the Prometheus text format."""
+        lines: List[str] = []
+        for metric in (self.stage_seconds, self.stage_errors, self.ask_requests,
+                       self.llm_tokens, self.embedding_tokens):
+            lines.extend(metric.render())
+        lines.extend(self._render_caches())
+        return "\n".join(lines) + "\n"
+
+    def _render_caches(self) -> List[str]:
+        """Export the hit/miss counters the caches keep themselves."""
+        from backend.answer_cache import get_answer_cache
+        from backend.clients.embedding_cache import get_embedding_cache
+        from backend.tools.web_cache import get_web_search_cache
+
+        stats = {}
+        for name, get_cache in (("embedding", get_embedding_cache), ("answer", get_answer_cache),
+                                ("web_search", get_web_search_cache)):
+            try:
+                stats[name] = get_cache().stats()
+            except Exception as e:
+                print(f"Warning: Could not read {name} cache stats: {e}")
+
+        lines = []
+        for field in ("hits", "misses"):
+            metric = f"notstuck_cache_{field}_total"
+            lines.append(f"# HELP {metric} Cache {field}, by cache.")
+            lines.append(f"# TYPE {metric} counter")
+            for name, cache_stats in sorted(stats.items()):
+                lines.append(f'{metric}{{cache="{name}"}} {_format_value(cache_stats[field])}')
+        return lines
+
+    def _get_tracer(self) -> Any:
+        """OpenTelemetry tracer when OTEL_TRACING_ENABLED=true, configured on first use."""
+        if self._tracing_checked:
+            return self._tracer
+        with self._tracer_lock:
+            if not self._tracing_checked:
+                self._tracer = _create_tracer() if tracing_enabled() else None
+                self._tracing_checked = True
+        return self._tracer
+
+
+def tracing_enabled() -> bool:
+    """Whether pipeline stages are traced with OpenTelemetry (OTEL_TRACING_ENABLED)."""
+    return os.getenv("OTEL_TRACING_ENABLED", "false").lower() == "true"
+
+
+def _create_tracer() -> Any:
+    """
+    Create the tracer, exporting over OTLP/HTTP when OTEL_EXPORTER_OTLP_ENDPOINT is set.
+
+    Without an endpoint the globally configured tracer provider is used, so an
+    application that sets up OpenTelemetry itself receives the spans.
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        print("⚠️ Warning: OTEL_TRACING_ENABLED is set but opentelemetry is not installed")
+        return None
+
+    if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            provider = TracerProvider(resource=Resource.create({
+                "service.name": os.getenv("OTEL_SERVICE_NAME", "notstuck-backend")
+            }))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+        except ImportError:
+            print("⚠️ Warning: OTLP export needs the tracing extra (opentelemetry-sdk and the OTLP exporter)")
+
+    return trace.get_tracer("backend")
+
+
+# Convenience function to get metrics instance
+def get_metrics() -> Metrics:
+    """Get singleton instance of Metrics."""
+    return Metrics.get_instance()
@@ -0,0 +1,234 @@
+"""
+Token streaming bridge between CrewAI and the /api/ask SSE endpoint.
+
+CrewAI emits an LLMStreamChunkEvent on its global event bus for every token of a
+streamed LLM call. The handlers below route those tokens to the request that
+started the kickoff (via a context variable) and forward only the text after the
+agent's "Final Answer:" marker, so thoughts and tool calls are not shown to users.
+Direct LLM calls (the /api/ask fast path) have no marker and forward every token.
+The same events time every LLM call, and token usage of each kickoff or call is
+counted in backend.metrics.
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    LLMStreamChunkEvent,
+)
+from crewai.utilities.token_counter_callback import TokenCalcHandler
+
+from backend.concurrency import get_executor
+from backend.crew_pool import get_crew_pool, get_default_model
+from backend.metrics import get_metrics
+
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class TokenStream:
+    """Collects final-answer tokens from the streamed LLM calls of one crew kickoff."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: "asyncio.Queue[str]",
+        require_marker: bool = True
+    ):
+        """
+        Initialize the token stream.
+
+        Args:
+            loop: Event loop that owns the queue
+            queue: Queue receiving final-answer text chunks
+            require_marker: Only forward text after "Final Answer:" (False forwards everything)
+        """
+        self._loop = loop
+        self._queue = queue
+        self._require_marker = require_marker
+        self._buffer = ""
+        self._in_final_answer = not require_marker
+        self._strip_leading = False
+        self.streamed = False
+
+    def start_call(self) -> None:
+        """Reset parsing state at the start of a new LLM call."""
+        self._buffer = ""
+        self._in_final_answer = not self._require_marker
+        self._strip_leading = False
+
+    def feed(self, chunk: str) -> None:
+        """
+        Consume a raw LLM chunk and forward any final-answer text.
+
+        Args:
+            chunk: Text chunk emitted by the LLM
+        """
+        if self._in_final_answer:
+            self._emit(chunk)
+            return
+
+        self._buffer += chunk
+        marker_index = self._buffer.find(FINAL_ANSWER_MARKER)
+        if marker_index == -1:
+            return
+
+        self._in_final_answer = True
+        self._strip_leading = True
+        self._emit(self._buffer[marker_index + len(FINAL_ANSWER_MARKER):])
+        self._buffer = ""
+
+    def _emit(self, text: str) -> None:
+        """Send text to the event loop, dropping whitespace right after the marker."""
+        if self._strip_leading:
+            text = text.lstrip()
+            if not text:
+                return
+            self._strip_leading = False
+
+        self.streamed = True
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, text)
+
+
+_current_stream: ContextVar[Optional[TokenStream]] = ContextVar("token_stream", default=None)
+# LLM call events are emitted synchronously by the thread making the call
+_call_timing = threading.local()
+
+
+@crewai_event_bus.on(LLMCallStartedEvent)
+def _on_llm_call_started(source: Any, event: LLMCallStartedEvent) -> None:
+    _call_timing.started_at = time.perf_counter()
+    token_stream = _current_stream.get()
+    if token_stream is not None:
+        token_stream.start_call()
+
+
+@crewai_event_bus.on(LLMCallCompletedEvent)
+def _on_llm_call_completed(source: Any, event: LLMCallCompletedEvent) -> None:
+    _observe_llm_call(failed=False)
+
+
+@crewai_event_bus.on(LLMCallFailedEvent)
+def _on_llm_call_failed(source: Any, event: LLMCallFailedEvent) -> None:
+    _observe_llm_call(failed=True)
+
+
+def _observe_llm_call(failed: bool) -> None:
+    """Record the latency of the LLM call that just ended on this thread."""
+    started_at = getattr(_call_timing, "started_at", None)
+    if started_at is None:
+        return
+    _call_timing.started_at = None
+    metrics = get_metrics()
+    metrics.observe("llm_call", time.perf_counter() - started_at)
+    if failed:
+        metrics.stage_errors.inc(stage="llm_call")
+
+
+def _record_tokens(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Count the tokens used by a kickoff or call."""
+    metrics = get_metrics()
+    metrics.llm_tokens.inc(prompt_tokens, model=model, kind="prompt")
+    metrics.llm_tokens.inc(completion_tokens, model=model, kind="completion")
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _on_llm_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    token_stream = _current_stream.get()
+    if token_stream is not None and event.tool_call is None:
+        token_stream.feed(event.chunk)
+
+
+async def stream_kickoff(inputs: Dict[str, Any], model: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Run a crew kickoff on the crew executor and yield answer text as it is generated.
+
+    The crew is checked out of the crew pool by the worker thread and returned
+    when the kickoff finishes, even if the client has stopped listening.
+    If the LLM did not stream (e.g. streaming disabled or unsupported by the
+    provider), the complete answer is yielded once the kickoff finishes.
+
+    Args:
+        inputs: Inputs interpolated into the crew's tasks
+        model: LLM model (defaults to DEFAULT_LLM_MODEL)
+
+    Yields:
+        Chunks of the final answer text
+    """
+    model = model or get_default_model()
+
+    def kickoff():
+        with get_crew_pool().checkout(model) as crew:
+            # Pooled crews keep a running token total, so count the difference
+            before = crew.calculate_usage_metrics()
+            with get_metrics().timed("crew_kickoff", model=model):
+                result = crew.kickoff(inputs=inputs)
+            after = crew.calculate_usage_metrics()
+            _record_tokens(
+                model,
+                after.prompt_tokens - before.prompt_tokens,
+                after.completion_tokens - before.completion_tokens
+            )
+            return result
+
+    async for chunk in _stream_call(kickoff, require_marker=True):
+        yield chunk
+
+
+async def stream_llm_call(llm: Any, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """
+    Run a single LLM call on the crew executor and yield its text as it is generated.
+
+    Args:
+        llm: CrewAI LLM instance
+        messages: Chat messages for the call
+
+    Yields:
+        Chunks of the response text
+    """
+    token_process = TokenProcess()
+
+    def call():
+        result = llm.call(messages, callbacks=[TokenCalcHandler(token_process)])
+        _record_tokens(llm.model, token_process.prompt_tokens, token_process.completion_tokens)
+        return result
+
+    async for chunk in _stream_call(call, require_marker=False):
+        yield chunk
+
+
+async def _stream_call(call: Callable[[], Any], require_marker: bool) -> AsyncIterator[str]:
+    """Run a blocking call that streams LLM tokens and yield them as they arrive."""
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    token_stream = TokenStream(loop, queue, require_marker=require_marker)
+
+    def run_call():
+        _current_stream.set(token_stream)
+        return call()
+
+    # The executor copies the current context, so request-scoped state follows the call
+    task = asyncio.ensure_future(get_executor("crew").run(run_call))
+
+    while not task.done():
+        getter = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+        if getter in done:
+            yield getter.result()
+        else:
+            getter.cancel()
+
+    while not queue.empty():
+        yield queue.get_nowait()
+
+    result = task.result()
+    if not token_stream.streamed:
+        yield str(result)
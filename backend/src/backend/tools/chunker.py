@@ -0,0 +1,277 @@
+"""
+Structure-aware, token-based document chunking.
+
+Pages are split into headings and sentences, measured with the embedding
+model's tokenizer, and packed into chunks of about CHUNK_TARGET_TOKENS tokens
+(never more than CHUNK_MAX_TOKENS). Chunks end at sentence boundaries,
+preferably at the end of a paragraph, and a heading always starts a new chunk
+once the current one has some content, so a section's title stays with its
+text.
+
+Overlap policy: after a chunk that ends inside a section, the next chunk
+repeats the previous chunk's last whole sentences, up to CHUNK_OVERLAP_TOKENS
+tokens (0 disables overlap). Chunks never overlap across a heading.
+
+Every line, sentence and token is processed once, so chunking is linear in the
+length of the document, and only the current chunk and the unfinished last
+sentence of a page are held in memory.
+"""
+
+import os
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from backend.clients.tokenizer import CHARS_PER_TOKEN, count_tokens, get_tokenizer
+
+# Blank lines separate paragraphs
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# Markdown headings, numbered section titles ("2.1 Installation", but not list items
+# like "1. Install") and ALL CAPS titles
+_HEADING_PATTERNS = (
+    re.compile(r'^#{1,6}\s+\S'),
+    re.compile(r'^(\d+\.)*\d+\s+[A-Z]|^(\d+\.)+\d+\.?\s+[A-Z]'),
+    re.compile(r'^[^a-z]*[A-Z]{2}[^a-z]*$'),
+)
+# Sentence end: terminal punctuation (plus closing quotes/brackets), whitespace, then a capital or digit
+_SENTENCE_END = re.compile(r'([.!?]["\')\]]*)\s+(?=["\'(\[]?[A-Z0-9])')
+_ABBREVIATIONS = frozenset({"e.g.", "i.e.", "etc.", "vs.", "mr.", "mrs.", "ms.", "dr.", "st.", "fig.", "no.", "approx."})
+_TERMINAL_PUNCTUATION = ('.', '!', '?', ':', ';', '"', "'", ')')
+_MAX_HEADING_LENGTH = 80
+_MAX_HEADING_WORDS = 10
+
+
+class _Unit(NamedTuple):
+    """A heading or sentence, the smallest piece a chunk is built from."""
+    text: str
+    tokens: int
+    page_number: Optional[int]
+    separator: str  # placed before the unit when it is not the first in its chunk
+    heading: bool
+
+
+class TextChunker:
+    """Packs headings and sentences into token-bounded chunks."""
+
+    def __init__(
+        self,
+        target_tokens: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None
+    ):
+        """
+        Initialize the chunker with environment variables.
+
+        Args:
+            target_tokens: Preferred chunk size (defaults to CHUNK_TARGET_TOKENS)
+            max_tokens: Hard chunk size limit (defaults to CHUNK_MAX_TOKENS)
+            overlap_tokens: Maximum repeated sentence tokens between chunks (defaults to CHUNK_OVERLAP_TOKENS)
+        """
+        self.target_tokens = target_tokens or int(os.getenv("CHUNK_TARGET_TOKENS", "400"))
+        self.max_tokens = max(max_tokens or int(os.getenv("CHUNK_MAX_TOKENS", "512")), self.target_tokens)
+        self.overlap_tokens = (
+            overlap_tokens if overlap_tokens is not None
+            else int(os.getenv("CHUNK_OVERLAP_TOKENS", "40"))
+        )
+        # A heading only closes the current chunk once it holds this much
+        self.min_tokens = self.target_tokens // 4
+
+    @property
+    def signature(self) -> str:
+        """Identifies the chunking settings, so changing them re-chunks unchanged files."""
+        return f"tokens:{self.target_tokens}:{self.max_tokens}:{self.overlap_tokens}"
+
+    def chunk_pages(self, pages: Iterable[Tuple[Optional[int], str]]) -> Iterator[Tuple[str, Optional[int]]]:
+        """
+        Split a stream of cleaned pages into chunks.
+
+        Args:
+            pages: (page number, text) tuples
+
+        Yields:
+            (chunk text, page number where the chunk starts) tuples
+        """
+        return self._pack(self._units(pages))
+
+    def _units(self, pages: Iterable[Tuple[Optional[int], str]]) -> Iterator[_Unit]:
+        """Split pages into headings and sentences."""
+        # A page (or text block) can end mid-sentence, so an unfinished last
+        # sentence is held back and continued by the next page
+        carry, carry_page = "", None
+        carry_limit = self.max_tokens * CHARS_PER_TOKEN
+
+        for page_number, text in pages:
+            if not text:
+                continue
+            paragraphs = _PARAGRAPH_BREAK.split(text)
+            if carry:
+                paragraphs[0] = carry + "\n" + paragraphs[0]
+            first_page = carry_page if carry else page_number
+
+            carry = ""
+            last = paragraphs[-1].rstrip()
+            if not last.endswith(_TERMINAL_PUNCTUATION):
+                cut = 0
+                for match in _SENTENCE_END.finditer(last):
+                    cut = match.end()
+                if len(last) - cut <= carry_limit:
+                    carry = last[cut:]
+                    carry_page = first_page if cut == 0 and len(paragraphs) == 1 else page_number
+                    paragraphs[-1] = last[:cut]
+
+            for index, paragraph in enumerate(paragraphs):
+                if paragraph.strip():
+                    yield from self._paragraph_units(paragraph, first_page if index == 0 else page_number)
+
+        if carry:
+            yield from self._paragraph_units(carry, carry_page)
+
+    def _paragraph_units(self, paragraph: str, page_number: Optional[int]) -> Iterator[_Unit]:
+        """Split a paragraph into heading lines and the sentences between them."""
+        lines: List[str] = []
+        separator = "\n\n"
+        previous_line = ""
+
+        raw_lines = [line.strip() for line in paragraph.split("\n")]
+        raw_lines = [line for line in raw_lines if line]
+        for index, line in enumerate(raw_lines):
+            next_line = raw_lines[index + 1] if index + 1 < len(raw_lines) else ""
+            if self._is_heading(line, previous_line, next_line, single_line=len(raw_lines) == 1):
+                if lines:
+                    yield from self._sentence_units(" ".join(lines), page_number, separator)
+                    lines = []
+                yield _Unit(line, count_tokens(line), page_number, "\n\n", True)
+                separator = "\n"
+            else:
+                lines.append(line)
+            previous_line = line
+
+        if lines:
+            yield from self._sentence_units(" ".join(lines), page_number, separator)
+
+    def _is_heading(self, line: str, previous_line: str, next_line: str, single_line: bool) -> bool:
+        """Whether a line is a heading rather than part of the running text."""
+        if len(line) > _MAX_HEADING_LENGTH:
+            return False
+        if _HEADING_PATTERNS[0].match(line):
+            return True
+        if line.endswith(_TERMINAL_PUNCTUATION) or len(line.split()) > _MAX_HEADING_WORDS:
+            return False
+        if any(pattern.match(line) for pattern in _HEADING_PATTERNS[1:]):
+            return True
+        # A short unpunctuated line on its own, or between finished sentences and a new one
+        # (wrapped lines of running text rarely follow a sentence end and are rarely this short)
+        if not line[0].isupper():
+            return False
+        if single_line:
+            return True
+        return (not previous_line or previous_line.endswith(('.', '!', '?', ':'))) and next_line[:1].isupper()
+
+    def _sentence_units(self, text: str, page_number: Optional[int], separator: str) -> Iterator[_Unit]:
+        """Split running text into sentences, splitting any sentence longer than max_tokens."""
+        start = 0
+        for match in _SENTENCE_END.finditer(text):
+            end = match.end(1)
+            last_word = text[text.rfind(" ", start, end) + 1:end].lower()
+            if last_word in _ABBREVIATIONS:
+                continue
+            yield from self._sized_units(text[start:end], page_number, separator)
+            separator = " "
+            start = match.end()
+        if start < len(text):
+            yield from self._sized_units(text[start:], page_number, separator)
+
+    def _sized_units(self, sentence: str, page_number: Optional[int], separator: str) -> Iterator[_Unit]:
+        """Yield a sentence as one unit, or as several if it exceeds max_tokens."""
+        tokens = count_tokens(sentence)
+        if tokens <= self.max_tokens:
+            yield _Unit(sentence, tokens, page_number, separator, False)
+            return
+
+        tokenizer = get_tokenizer()
+        if tokenizer is not None:
+            ids = tokenizer.encode(sentence, disallowed_special=())
+            pieces = [tokenizer.decode(ids[i:i + self.max_tokens]) for i in range(0, len(ids), self.max_tokens)]
+        else:
+            pieces = self._split_words(sentence, self.max_tokens * CHARS_PER_TOKEN)
+        for piece in pieces:
+            piece = piece.strip()
+            if piece:
+                yield _Unit(piece, count_tokens(piece), page_number, separator, False)
+                separator = " "
+
+    @staticmethod
+    def _split_words(text: str, max_chars: int) -> List[str]:
+        """Split text into pieces of at most max_chars, at spaces where possible."""
+        pieces = []
+        start = 0
+        while len(text) - start > max_chars:
+            end = text.rfind(" ", start, start + max_chars)
+            if end <= start:
+                end = start + max_chars
+            pieces.append(text[start:end])
+            start = end
+        pieces.append(text[start:])
+        return pieces
+
+    def _pack(self, units: Iterable[_Unit]) -> Iterator[Tuple[str, Optional[int]]]:
+        """Pack units into chunks of about target_tokens."""
+        current: List[_Unit] = []
+        tokens = 0
+        overlap_units = 0  # leading units of current repeated from the previous chunk
+
+        def flush(with_overlap: bool) -> Iterator[Tuple[str, Optional[int]]]:
+            nonlocal current, tokens, overlap_units
+            if len(current) > overlap_units:
+                yield self._join(current), current[0].page_number
+
+            carried: List[_Unit] = []
+            carried_tokens = 0
+            if with_overlap and self.overlap_tokens > 0 and len(current) > overlap_units:
+                for unit in reversed(current[overlap_units:]):
+                    if unit.heading or carried_tokens + unit.tokens > self.overlap_tokens:
+                        break
+                    carried.append(unit)
+                    carried_tokens += unit.tokens
+                # Never repeat a whole chunk
+                if len(carried) == len(current) - overlap_units:
+                    carried, carried_tokens = [], 0
+            current = carried[::-1]
+            tokens = carried_tokens
+            overlap_units = len(current)
+
+        for unit in units:
+            if unit.heading:
+                if tokens - self._overlap_size(current, overlap_units) >= self.min_tokens:
+                    yield from flush(with_overlap=False)
+                elif overlap_units:
+                    # Sections do not start with sentences from the previous one
+                    del current[:overlap_units]
+                    tokens = sum(u.tokens for u in current)
+                    overlap_units = 0
+            elif tokens + unit.tokens > self.max_tokens:
+                yield from flush(with_overlap=True)
+                if tokens + unit.tokens > self.max_tokens:
+                    current, tokens, overlap_units = [], 0, 0
+            elif tokens >= self.target_tokens or (
+                unit.separator != " " and tokens >= self.target_tokens * 3 // 4
+            ):
+                # Close at a sentence boundary once on target, a little earlier at a paragraph end
+                yield from flush(with_overlap=True)
+            current.append(unit)
+            tokens += unit.tokens
+
+        yield from flush(with_overlap=False)
+
+    @staticmethod
+    def _overlap_size(current: List[_Unit], overlap_units: int) -> int:
+        """Tokens of the units repeated from the previous chunk."""
+        return sum(unit.tokens for unit in current[:overlap_units])
+
+    @staticmethod
+    def _join(units: List[_Unit]) -> str:
+        """Join units into chunk text, keeping paragraph and heading breaks."""
+        parts = [units[0].text]
+        for unit in units[1:]:
+            parts.append(unit.separator)
+            parts.append(unit.text)
+        return "".join(parts)
@@ -0,0 +1,248 @@
+"""
+Per-document ingest manifests.
+
+Records, for every ingested source file, the hash of the file that was last
+ingested and the ids of the chunk vectors it produced. Chunk ids are derived
+from chunk content, so re-ingesting a document only needs to embed chunks whose
+ids are not in the manifest and delete ids that are no longer produced.
+A vector collapsed from near-duplicate chunks is referenced by every source
+file containing it, and is only deleted once none of them references it.
+Source files are tracked per namespace; the same filename in two namespaces
+is two independent documents.
+
+A knowledge-base version number is bumped on every change, so caches of
+answers derived from the index can tell when they are stale.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class DocumentManifestStore:
+    """SQLite store of file hashes and chunk ids per source file."""
+
+    _instance: Optional['DocumentManifestStore'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the manifest store with environment variables.
+
+        Args:
+            path: SQLite file path (defaults to DOCUMENT_MANIFEST_PATH)
+        """
+        self.path = path or os.getenv("DOCUMENT_MANIFEST_PATH", ".cache/manifests.sqlite3")
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "namespace TEXT NOT NULL DEFAULT '', source_file TEXT NOT NULL, file_hash TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (namespace, source_file))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "namespace TEXT NOT NULL DEFAULT '', source_file TEXT NOT NULL, vector_id TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, source_file, vector_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_vector ON chunks (vector_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS version (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)"
+        )
+        self._conn.execute("INSERT OR IGNORE INTO version (id, value) VALUES (0, 0)")
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls) -> 'DocumentManifestStore':
+        """Get singleton instance of DocumentManifestStore."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _migrate(self) -> None:
+        """Move manifests written before namespaces into the default namespace."""
+        columns = [column[1] for column in self._conn.execute("PRAGMA table_info(documents)")]
+        if not columns or "namespace" in columns:
+            return
+        for table in ("documents", "chunks"):
+            self._conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        self._conn.execute(
+            "CREATE TABLE documents ("
+            "namespace TEXT NOT NULL DEFAULT '', source_file TEXT NOT NULL, file_hash TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (namespace, source_file))"
+        )
+        self._conn.execute(
+            "CREATE TABLE chunks ("
+            "namespace TEXT NOT NULL DEFAULT '', source_file TEXT NOT NULL, vector_id TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, source_file, vector_id))"
+        )
+        self._conn.execute(
+            "INSERT INTO documents (source_file, file_hash, updated_at) "
+            "SELECT source_file, file_hash, updated_at FROM documents_old"
+        )
+        self._conn.execute("INSERT INTO chunks (source_file, vector_id) SELECT source_file, vector_id FROM chunks_old")
+        self._conn.execute("DROP TABLE documents_old")
+        self._conn.execute("DROP TABLE chunks_old")
+        self._conn.commit()
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """
+        Hash a file's contents without loading it into memory.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Hex SHA-256 digest of the file
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get_version(self) -> int:
+        """Get the knowledge-base version, which changes whenever a manifest does."""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM version WHERE id = 0").fetchone()[0]
+
+    def get_file_hash(self, source_file: str, namespace: str = "") -> Optional[str]:
+        """Get the hash of the file last ingested under this name, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_hash FROM documents WHERE namespace = ? AND source_file = ?", (namespace, source_file)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_chunk_ids(self, source_file: str, namespace: str = "") -> Set[str]:
+        """Get the vector ids currently stored for a source file."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vector_id FROM chunks WHERE namespace = ? AND source_file = ?", (namespace, source_file)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def list_documents(self, namespace: str = "") -> List[Dict[str, Any]]:
+        """
+        List the source files of a namespace.
+
+        Args:
+            namespace: Namespace to list
+
+        Returns:
+            Dicts with "source_file", "chunks" and "updated_at" keys, sorted by name
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.source_file, COUNT(c.vector_id), d.updated_at FROM documents d "
+                "LEFT JOIN chunks c ON c.namespace = d.namespace AND c.source_file = d.source_file "
+                "WHERE d.namespace = ? GROUP BY d.source_file ORDER BY d.source_file",
+                (namespace,)
+            ).fetchall()
+        return [
+            {"source_file": source_file, "chunks": chunks, "updated_at": updated_at}
+            for source_file, chunks, updated_at in rows
+        ]
+
+    def get_referenced_elsewhere(self, vector_ids: Iterable[str], source_file: str, namespace: str = "") -> Set[str]:
+        """
+        Find vectors that other source files also reference (collapsed near-duplicates).
+
+        Args:
+            vector_ids: Vector ids to check
+            source_file: Source file whose references are ignored
+            namespace: Namespace of the source file
+
+        Returns:
+            The subset of vector_ids referenced by another source file
+        """
+        vector_ids = list(vector_ids)
+        shared: Set[str] = set()
+        with self._lock:
+            for i in range(0, len(vector_ids), 500):
+                batch = vector_ids[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT DISTINCT vector_id FROM chunks WHERE namespace = ? AND source_file != ? "
+                    f"AND vector_id IN ({placeholders})",
+                    [namespace, source_file, *batch]
+                ).fetchall()
+                shared.update(row[0] for row in rows)
+        return shared
+
+    def get_sources(self, vector_id: str, namespace: str = "") -> List[str]:
+        """Get the source files that reference a vector, sorted by name."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_file FROM chunks WHERE namespace = ? AND vector_id = ? ORDER BY source_file",
+                (namespace, vector_id)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def save(self, source_file: str, file_hash: str, chunk_ids: Iterable[str], namespace: str = "") -> None:
+        """
+        Replace the manifest of a source file after a successful ingest.
+
+        Args:
+            source_file: Source filename
+            file_hash: Hash of the ingested file
+            chunk_ids: Ids of every chunk vector the file now has
+            namespace: Namespace of the source file
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE namespace = ? AND source_file = ?", (namespace, source_file)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunks (namespace, source_file, vector_id) VALUES (?, ?, ?)",
+                ((namespace, source_file, vector_id) for vector_id in chunk_ids)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (namespace, source_file, file_hash, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, source_file, file_hash, time.time())
+            )
+            self._bump_version()
+            self._conn.commit()
+
+    def delete(self, source_file: str, namespace: str = "") -> None:
+        """Forget a source file."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE namespace = ? AND source_file = ?", (namespace, source_file)
+            )
+            self._conn.execute(
+                "DELETE FROM documents WHERE namespace = ? AND source_file = ?", (namespace, source_file)
+            )
+            self._bump_version()
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Forget every source file (e.g. after the index was wiped)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM documents")
+            self._bump_version()
+            self._conn.commit()
+
+    def _bump_version(self) -> None:
+        """Increment the knowledge-base version (caller holds the lock)."""
+        self._conn.execute("UPDATE version SET value = value + 1 WHERE id = 0")
+
+
+# Convenience function to get store instance
+def get_manifest_store() -> DocumentManifestStore:
+    """Get singleton instance of DocumentManifestStore."""
+    return DocumentManifestStore.get_instance()
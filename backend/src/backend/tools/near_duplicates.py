@@ -0,0 +1,212 @@
+"""
+Ingest-time near-duplicate detection with MinHash and LSH.
+
+Boilerplate (headers, footers, disclaimers) and sections copied between
+documents would otherwise be embedded and stored once per copy, and the copies
+would crowd each other out of the top-k search results. Each chunk is reduced
+to a MinHash signature over its word shingles; signatures are split into bands
+and indexed by band hash in SQLite, so candidates are found with one indexed
+lookup per band and confirmed by their estimated Jaccard similarity. The index
+persists across uploads and restarts. Chunks only match within their own
+namespace, so tenants never share vectors.
+
+DEDUP_MODE decides what happens to a duplicate chunk:
+- collapse (default): no new vector; the document references the existing
+  vector, whose metadata lists every document containing it
+- skip: the chunk is dropped
+- off: every chunk is stored
+"""
+
+import os
+import re
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEDUP_COLLAPSE = "collapse"
+DEDUP_SKIP = "skip"
+DEDUP_OFF = "off"
+
+_WORD_PATTERN = re.compile(r"\w+")
+# Mersenne prime 2^31 - 1: products of two values below it fit in 64 bits
+_PRIME = (1 << 31) - 1
+
+
+def dedup_mode() -> str:
+    """How near-duplicate chunks are handled (DEDUP_MODE=collapse, skip or off)."""
+    mode = os.getenv("DEDUP_MODE", DEDUP_COLLAPSE).lower()
+    return mode if mode in (DEDUP_COLLAPSE, DEDUP_SKIP) else DEDUP_OFF
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index of stored chunk vectors."""
+
+    _instance: Optional['NearDuplicateIndex'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the index with environment variables.
+
+        Args:
+            path: SQLite file path (defaults to DEDUP_INDEX_PATH)
+        """
+        self.path = path or os.getenv("DEDUP_INDEX_PATH", ".cache/near_duplicates.sqlite3")
+        self.threshold = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+        self.shingle_size = int(os.getenv("DEDUP_SHINGLE_WORDS", "5"))
+        # 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a band
+        self.bands = int(os.getenv("DEDUP_BANDS", "16"))
+        self.rows = int(os.getenv("DEDUP_ROWS", "8"))
+        num_perm = self.bands * self.rows
+
+        # Fixed seed: signatures must stay comparable across restarts
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures (vector_id TEXT PRIMARY KEY, signature BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, vector_id TEXT NOT NULL)"
+        )
+        for table in ("signatures", "buckets"):
+            columns = [column[1] for column in self._conn.execute(f"PRAGMA table_info({table})")]
+            if "namespace" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_vector ON buckets (vector_id)")
+        self._conn.commit()
+
+    @classmethod
+    def get_instance(cls) -> 'NearDuplicateIndex':
+        """Get singleton instance of NearDuplicateIndex."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text's word shingles.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            uint64 array of bands * rows minimum hashes
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) & _PRIME for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def find_duplicate(
+        self,
+        signature: np.ndarray,
+        exclude: Optional[Callable[[str], bool]] = None,
+        namespace: str = ""
+    ) -> Optional[str]:
+        """
+        Find an indexed vector whose text is a near-duplicate.
+
+        Args:
+            signature: MinHash signature of the new chunk
+            exclude: Optional predicate for vector ids that must not be returned
+            namespace: Namespace of the new chunk
+
+        Returns:
+            Id of the most similar vector at or above DEDUP_THRESHOLD, or None
+        """
+        keys = self._band_keys(signature)
+        conditions = " OR ".join(["(band = ? AND bucket = ?)"] * len(keys))
+        params = [namespace, *(value for key in keys for value in key)]
+        with self._lock:
+            candidates = [row[0] for row in self._conn.execute(
+                f"SELECT DISTINCT vector_id FROM buckets WHERE namespace = ? AND ({conditions})", params
+            )]
+            if exclude is not None:
+                candidates = [vector_id for vector_id in candidates if not exclude(vector_id)]
+            if not candidates:
+                return None
+            placeholders = ",".join("?" * len(candidates))
+            rows = self._conn.execute(
+                f"SELECT vector_id, signature FROM signatures WHERE vector_id IN ({placeholders})", candidates
+            ).fetchall()
+
+        best_id, best_similarity = None, self.threshold
+        for vector_id, blob in rows:
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint64) == signature))
+            if similarity >= best_similarity:
+                best_id, best_similarity = vector_id, similarity
+        return best_id
+
+    def add(self, vector_id: str, signature: np.ndarray, namespace: str = "") -> None:
+        """
+        Index a stored chunk vector.
+
+        Args:
+            vector_id: Vector id
+            signature: MinHash signature of the chunk text
+            namespace: Namespace of the vector
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets WHERE vector_id = ?", (vector_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures (vector_id, signature, namespace) VALUES (?, ?, ?)",
+                (vector_id, signature.astype(np.uint64).tobytes(), namespace)
+            )
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, vector_id, namespace) VALUES (?, ?, ?, ?)",
+                [(band, bucket, vector_id, namespace) for band, bucket in self._band_keys(signature)]
+            )
+            self._conn.commit()
+
+    def remove(self, vector_ids: Iterable[str]) -> None:
+        """Forget deleted vectors."""
+        params = [(vector_id,) for vector_id in vector_ids]
+        if not params:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM buckets WHERE vector_id = ?", params)
+            self._conn.executemany("DELETE FROM signatures WHERE vector_id = ?", params)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Forget every vector (e.g. after the index was wiped)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets")
+            self._conn.execute("DELETE FROM signatures")
+            self._conn.commit()
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        """(band, bucket hash) pairs of a signature."""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].astype(np.uint64).tobytes()
+            digest = hashlib.blake2b(rows, digest_size=8).digest()
+            keys.append((band, int.from_bytes(digest, 'big', signed=True)))
+        return keys
+
+
+# Convenience function to get index instance
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Get singleton instance of NearDuplicateIndex."""
+    return NearDuplicateIndex.get_instance()
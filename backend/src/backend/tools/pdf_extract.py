@@ -0,0 +1,96 @@
+"""
+Multi-process PDF text extraction.
+
+pypdf text extraction is CPU-bound pure Python, so large PDFs are split into
+page ranges that worker processes extract in parallel. This module only imports
+pypdf so that spawned workers start quickly.
+"""
+
+import os
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_workers() -> int:
+    """Number of worker processes used for parallel extraction (PDF_PARSE_WORKERS)."""
+    return int(os.getenv("PDF_PARSE_WORKERS", str(os.cpu_count() or 1)))
+
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking a process that is running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=get_pdf_workers(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract the text of pages [start, end) in a worker process.
+
+    Args:
+        file_path: Path to the PDF file
+        start: Index of the first page (0-based)
+        end: Index after the last page
+
+    Returns:
+        Text of each page in order
+    """
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, end)]
+
+
+def iter_pages_parallel(file_path: str, num_pages: int) -> Iterator[Tuple[int, str]]:
+    """
+    Extract a PDF's pages across worker processes, yielding them in page order.
+
+    At most two page ranges per worker are in flight, so memory stays bounded
+    no matter how many pages the document has.
+
+    Args:
+        file_path: Path to the PDF file
+        num_pages: Number of pages in the document
+
+    Yields:
+        (page number, text) tuples with 1-based page numbers
+    """
+    pool = get_pdf_process_pool()
+    pages_per_task = int(os.getenv("PDF_PARSE_PAGES_PER_TASK", "25"))
+    ranges = iter([
+        (start, min(start + pages_per_task, num_pages))
+        for start in range(0, num_pages, pages_per_task)
+    ])
+    pending: Deque[Tuple[int, Future]] = deque()
+
+    def submit_next() -> None:
+        page_range = next(ranges, None)
+        if page_range is not None:
+            pending.append((page_range[0], pool.submit(extract_page_range, file_path, *page_range)))
+
+    for _ in range(get_pdf_workers() * 2):
+        submit_next()
+
+    try:
+        while pending:
+            start, future = pending.popleft()
+            texts = future.result()
+            submit_next()
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+    finally:
+        for _, future in pending:
+            future.cancel()
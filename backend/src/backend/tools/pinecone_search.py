@@ -3,7 +3,16 @@ from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from backend.clients.openai_client import get_openai_client
-from backend.clients.pinecone_client import get_pinecone_client
+from backend.clients.sparse_encoder import (
+    get_hybrid_alpha,
+    get_sparse_encoder,
+    hybrid_scale,
+    hybrid_search_enabled,
+)
+from backend.clients.vector_store import get_vector_store
+from backend.metrics import get_metrics
+from backend.tools.reranker import get_rerank_fetch_k, rerank, rerank_enabled
+from backend.tools.retrieval_context import collect_sources, get_retrieval_context
 
 
 class PineconeSearchInput(BaseModel):
@@ -13,12 +22,13 @@ class PineconeSearchInput(BaseModel):
 
 
 class PineconeSearchTool(BaseTool):
-    """Tool for searching Pinecone vector database with hybrid search."""
+    """Tool for searching the vector database with hybrid dense + BM25 sparse search."""
 
     name: str = "Pinecone Search"
     description: str = (
         "Searches the Pinecone vector database for relevant document chunks "
-        "using hybrid search (semantic similarity). Returns relevant text chunks "
+        "using hybrid search (semantic similarity plus keyword matching, so exact "
+        "identifiers such as part numbers and error codes are found). Returns relevant text chunks "
         "with source file information. Use this tool to find context from uploaded documents "
         "before answering questions."
     )
@@ -35,59 +45,47 @@ class PineconeSearchTool(BaseTool):
         Returns:
             Formatted string with search results including text and source files
         """
-        try:
-            openai_client = get_openai_client()
-            pinecone_client = get_pinecone_client()
-
-            # Get index
-            index = pinecone_client.get_index()
-
-            # Generate query embedding
-            query_embedding = openai_client.create_embedding(query)
-
-            # Search Pinecone
-            results = index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=True
+        search_results = self.search_with_metadata(query=query, top_k=top_k)
+
+        if "error" in search_results:
+            return f"Error searching Pinecone: {search_results['error']}"
+
+        # Check if we found any matches
+        if not search_results["found_context"]:
+            return "No relevant context found in the knowledge base."
+
+        # Format results
+        formatted_results = []
+        sources = set()
+
+        for i, result in enumerate(search_results["results"], 1):
+            source_file = result["source_file"]
+            sources.add(source_file)
+            sources.update(result.get("duplicate_sources", []))
+            page_text = f", Page: {result['page_number']}" if result.get("page_number") is not None else ""
+            if result.get("duplicate_sources"):
+                page_text += f", Also in: {', '.join(result['duplicate_sources'])}"
+
+            formatted_results.append(
+                f"[Result {i}] (Score: {result['score']:.4f}, Source: {source_file}{page_text}, "
+                f"Chunk: {result['chunk_index']})\n"
+                f"{result['text']}\n"
             )
 
-            # Check if we found any matches
-            if not results.matches or len(results.matches) == 0:
-                return "No relevant context found in the knowledge base."
-
-            # Format results
-            formatted_results = []
-            sources = set()
-
-            for i, match in enumerate(results.matches, 1):
-                score = match.score
-                metadata = match.metadata
-
-                text = metadata.get('text', 'No text available')
-                source_file = metadata.get('source_file', 'Unknown source')
-                chunk_index = metadata.get('chunk_index', 0)
-
-                sources.add(source_file)
-
-                formatted_results.append(
-                    f"[Result {i}] (Score: {score:.4f}, Source: {source_file}, Chunk: {chunk_index})\n"
-                    f"{text}\n"
-                )
-
-            result_text = "\n".join(formatted_results)
-            sources_text = "Sources: " + ", ".join(sorted(sources))
+        result_text = "\n".join(formatted_results)
+        sources_text = "Sources: " + ", ".join(sorted(sources))
 
-            return f"{result_text}\n{sources_text}"
-
-        except Exception as e:
-            return f"Error searching Pinecone: {str(e)}"
+        return f"{result_text}\n{sources_text}"
 
     def search_with_metadata(self, query: str, top_k: int = 5) -> Dict[str, Any]:
         """
         Search Pinecone and return structured results with metadata.
         This method is for use outside of CrewAI context (e.g., in FastAPI endpoints).
 
+        Inside a retrieval scope, results for a query already searched during the
+        same request are reused instead of embedding and querying again, and the
+        search is restricted to the scope's namespace and metadata filter.
+
         Args:
             query: Search query
             top_k: Number of top results to return
@@ -95,56 +93,82 @@ class PineconeSearchTool(BaseTool):
         Returns:
             Dictionary with results and metadata
         """
+        retrieval_context = get_retrieval_context()
+        if retrieval_context is not None:
+            cached = retrieval_context.get(query, top_k)
+            if cached is not None:
+                return cached
+
         try:
             openai_client = get_openai_client()
-            pinecone_client = get_pinecone_client()
-
-            # Get index
-            index = pinecone_client.get_index()
-
-            # Generate query embedding
-            query_embedding = openai_client.create_embedding(query)
-
-            # Search Pinecone
-            results = index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=True
-            )
+            metrics = get_metrics()
+
+            # Generate query embedding, unless the request already did (and timed it)
+            query_embedding = retrieval_context.get_embedding(query) if retrieval_context else None
+            if query_embedding is None:
+                with metrics.timed("query_embed"):
+                    query_embedding = openai_client.create_embedding(query)
+
+            # Lexical-heavy queries (part numbers, error codes) are matched by the
+            # BM25 sparse vector, weighted against the dense one by alpha
+            sparse_vector = None
+            alpha = get_hybrid_alpha()
+            if hybrid_search_enabled() and alpha < 1.0:
+                sparse_vector = get_sparse_encoder().encode_query(query)
+                if sparse_vector["indices"]:
+                    query_embedding, sparse_vector = hybrid_scale(query_embedding, sparse_vector, alpha)
+                else:
+                    sparse_vector = None
+
+            # Search the vector store, over-fetching candidates for the rerank stage
+            reranking = rerank_enabled()
+            fetch_k = get_rerank_fetch_k(top_k) if reranking else top_k
+            with metrics.timed("vector_query"):
+                matches = get_vector_store().query(
+                    query_embedding,
+                    fetch_k,
+                    sparse_vector=sparse_vector,
+                    namespace=retrieval_context.namespace if retrieval_context else "",
+                    filter=retrieval_context.filter if retrieval_context else None
+                )
 
             # Check if we found any matches
-            if not results.matches or len(results.matches) == 0:
-                return {
+            if not matches:
+                search_results = {
                     "found_context": False,
                     "results": [],
                     "sources": []
                 }
-
-            # Format results
-            formatted_results = []
-            sources = []
-
-            for match in results.matches:
-                metadata = match.metadata
-                formatted_results.append({
-                    "text": metadata.get('text', ''),
-                    "source_file": metadata.get('source_file', 'Unknown'),
-                    "chunk_index": metadata.get('chunk_index', 0),
-                    "score": match.score
-                })
-
-                # Track unique sources
-                source_info = {
-                    "source_file": metadata.get('source_file', 'Unknown'),
+            else:
+                # Format results
+                formatted_results = []
+
+                for match in matches:
+                    metadata = match.metadata
+                    formatted_results.append({
+                        "text": metadata.get('text', ''),
+                        "source_file": metadata.get('source_file', 'Unknown'),
+                        "chunk_index": metadata.get('chunk_index', 0),
+                        "page_number": int(metadata['page_number']) if 'page_number' in metadata else None,
+                        "score": match.score,
+                        # Other documents containing a near-duplicate of this chunk
+                        "duplicate_sources": list(metadata.get('duplicate_sources', []))
+                    })
+
+                if reranking:
+                    with metrics.timed("rerank"):
+                        formatted_results = rerank(query, formatted_results, top_k)
+
+                search_results = {
+                    "found_context": True,
+                    "results": formatted_results,
+                    "sources": collect_sources(formatted_results)
                 }
-                if source_info not in sources:
-                    sources.append(source_info)
 
-            return {
-                "found_context": True,
-                "results": formatted_results,
-                "sources": sources
-            }
+            if retrieval_context is not None:
+                retrieval_context.put(query, top_k, search_results)
+
+            return search_results
 
         except Exception as e:
             return {
@@ -0,0 +1,136 @@
+"""
+Re-ranking of over-fetched search results.
+
+search_with_metadata can fetch RERANK_FETCH_K candidates and reorder them here
+before keeping the best top_k. Candidates are scored by a local cross-encoder
+(RERANK_MODEL, requires the optional sentence-transformers dependency) or, by
+default, by a fast lexical scorer blended with the retrieval score. Scoring
+runs in batches of RERANK_BATCH_SIZE and stops once RERANK_BUDGET_MS has
+elapsed; candidates that were not scored keep their retrieval order after the
+scored ones.
+"""
+
+import os
+import math
+import time
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.clients.sparse_encoder import BM25Encoder
+
+LEXICAL_MODEL = "lexical"
+
+_cross_encoder = None
+_cross_encoder_lock = threading.Lock()
+
+
+def rerank_enabled() -> bool:
+    """Whether search results are re-ranked (RERANK_ENABLED)."""
+    return os.getenv("RERANK_ENABLED", "false").lower() == "true"
+
+
+def get_rerank_fetch_k(top_k: int) -> int:
+    """Number of candidates to fetch for a final top_k (RERANK_FETCH_K)."""
+    return max(top_k, int(os.getenv("RERANK_FETCH_K", "50")))
+
+
+def _get_cross_encoder(model_name: str):
+    """Load the cross-encoder once, or return None if it is unavailable."""
+    global _cross_encoder
+    with _cross_encoder_lock:
+        if _cross_encoder is None:
+            try:
+                from sentence_transformers import CrossEncoder
+
+                _cross_encoder = CrossEncoder(model_name, device="cpu")
+            except Exception as e:
+                print(f"⚠️ Warning: Could not load rerank model {model_name}, using lexical scoring: {e}")
+                _cross_encoder = False
+        return _cross_encoder or None
+
+
+def _lexical_scorer(query: str, results: List[Dict[str, Any]]) -> Callable[[List[int]], List[float]]:
+    """
+    Build a scorer blending the retrieval score with query term coverage.
+
+    Term weights are IDF over the candidate set, so terms shared by every
+    candidate count little; an exact occurrence of the query's word pairs
+    adds a phrase bonus.
+    """
+    query_terms = list(dict.fromkeys(BM25Encoder.tokenize(query)))
+    query_pairs = [" ".join(pair) for pair in zip(query_terms, query_terms[1:])]
+    candidate_tokens = [BM25Encoder.tokenize(result["text"]) for result in results]
+    candidate_terms = [Counter(tokens) for tokens in candidate_tokens]
+    candidate_texts = [" ".join(tokens) for tokens in candidate_tokens] if query_pairs else []
+
+    num_candidates = len(results)
+    weights = {}
+    for term in query_terms:
+        df = sum(1 for terms in candidate_terms if term in terms)
+        weights[term] = math.log(1 + (num_candidates - df + 0.5) / (df + 0.5))
+    total_weight = sum(weights.values()) or 1.0
+
+    retrieval_scores = [result["score"] for result in results]
+    low, high = min(retrieval_scores), max(retrieval_scores)
+    spread = (high - low) or 1.0
+
+    def score(positions: List[int]) -> List[float]:
+        scores = []
+        for i in positions:
+            terms = candidate_terms[i]
+            coverage = sum(
+                weights[term] * terms[term] / (terms[term] + 1.2) for term in query_terms if term in terms
+            ) / total_weight
+            phrase = 0.0
+            if query_pairs:
+                phrase = sum(1 for pair in query_pairs if pair in candidate_texts[i]) / len(query_pairs)
+            retrieval = (results[i]["score"] - low) / spread
+            scores.append(0.5 * retrieval + 0.4 * coverage + 0.1 * phrase)
+        return scores
+
+    return score
+
+
+def rerank(query: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Reorder search results by relevance to the query and keep the best top_k.
+
+    Args:
+        query: Search query
+        results: Formatted search results with "text" and "score" keys, in retrieval order
+        top_k: Number of results to keep
+
+    Returns:
+        Best top_k results, each with an added "rerank_score" (None if the latency budget ran out)
+    """
+    if len(results) <= 1:
+        return results[:top_k]
+
+    model_name = os.getenv("RERANK_MODEL", LEXICAL_MODEL)
+    batch_size = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+    budget = int(os.getenv("RERANK_BUDGET_MS", "200")) / 1000
+
+    cross_encoder = _get_cross_encoder(model_name) if model_name != LEXICAL_MODEL else None
+    if cross_encoder is not None:
+        def score_batch(positions: List[int]) -> List[float]:
+            pairs = [(query, results[i]["text"]) for i in positions]
+            return [float(value) for value in cross_encoder.predict(pairs, batch_size=batch_size)]
+    else:
+        score_batch = _lexical_scorer(query, results)
+
+    started = time.perf_counter()
+    rerank_scores: List[Optional[float]] = [None] * len(results)
+    for start in range(0, len(results), batch_size):
+        if time.perf_counter() - started > budget:
+            break
+        positions = list(range(start, min(start + batch_size, len(results))))
+        for i, value in zip(positions, score_batch(positions)):
+            rerank_scores[i] = value
+
+    # Scored candidates first by rerank score; the rest keep retrieval order
+    order = sorted(
+        range(len(results)),
+        key=lambda i: (rerank_scores[i] is None, -(rerank_scores[i] or 0.0), i)
+    )
+    return [{**results[i], "rerank_score": rerank_scores[i]} for i in order[:top_k]]
@@ -0,0 +1,238 @@
+"""
+Request-scoped retrieval context.
+
+Lets the /api/ask sources event and the crew's Pinecone Search tool calls share
+the results of a single embedding + vector query for the same question.
+
+The context also carries the request's search scope: the namespace (tenant or
+collection) and metadata filter that every search made for the request is
+restricted to, including the searches the crew's agent decides to make.
+"""
+
+import re
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def build_metadata_filter(
+    source_files: Optional[List[str]] = None,
+    doc_types: Optional[List[str]] = None,
+    uploaded_after: Optional[datetime] = None,
+    uploaded_before: Optional[datetime] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build a vector store metadata filter from search filter parameters.
+
+    Args:
+        source_files: Only chunks from these documents (including collapsed near-duplicates)
+        doc_types: Only chunks from these file types ("pdf", "docx", "txt")
+        uploaded_after: Only chunks uploaded at or after this time (naive times are UTC)
+        uploaded_before: Only chunks uploaded before this time (naive times are UTC)
+
+    Returns:
+        Pinecone-style filter, or None if no parameter is set
+    """
+    conditions: List[Dict[str, Any]] = []
+    if source_files:
+        conditions.append({"$or": [
+            {"source_file": {"$in": source_files}},
+            {"duplicate_sources": {"$in": source_files}},
+        ]})
+    if doc_types:
+        conditions.append({"doc_type": {"$in": [doc_type.lower().lstrip(".") for doc_type in doc_types]}})
+    uploaded_at: Dict[str, float] = {}
+    if uploaded_after is not None:
+        uploaded_at["$gte"] = _timestamp(uploaded_after)
+    if uploaded_before is not None:
+        uploaded_at["$lt"] = _timestamp(uploaded_before)
+    if uploaded_at:
+        conditions.append({"uploaded_at": uploaded_at})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def _timestamp(value: datetime) -> float:
+    """Unix timestamp of a datetime, reading naive datetimes as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def collect_sources(results: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """
+    List the unique documents cited by search results.
+
+    Args:
+        results: Formatted search results
+
+    Returns:
+        {"source_file": ...} dicts in result order, including the documents
+        holding collapsed near-duplicates of a result
+    """
+    sources: List[Dict[str, str]] = []
+    for result in results:
+        for source_file in [result["source_file"], *result.get("duplicate_sources", [])]:
+            source_info = {"source_file": source_file}
+            if source_info not in sources:
+                sources.append(source_info)
+    return sources
+
+
+def cite_results(search_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn search results into the source citations returned with an answer.
+
+    Args:
+        search_results: Search result dictionary from search_with_metadata
+
+    Returns:
+        One citation per result with "source_file", "page_number", "text" and
+        "duplicate_sources" keys (empty if no relevant context was found)
+    """
+    if not search_results.get("found_context", False):
+        return []
+    return [
+        {
+            "source_file": result.get("source_file", "Unknown"),
+            "page_number": result.get("page_number"),
+            "text": result.get("text", ""),
+            "duplicate_sources": list(result.get("duplicate_sources", []))
+        }
+        for result in search_results.get("results", [])
+    ]
+
+
+class RetrievalContext:
+    """Holds search results computed during one request, keyed by normalized query."""
+
+    def __init__(self, namespace: str = "", filter: Optional[Dict[str, Any]] = None):
+        """
+        Initialize an empty context.
+
+        Args:
+            namespace: Namespace every search of the request is restricted to
+            filter: Metadata filter every search of the request is restricted to
+        """
+        self.namespace = namespace
+        self.filter = filter
+        self._results: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._embeddings: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Set by the web search tools; answers built from the web are not cached
+        self.used_web_search = False
+
+    @property
+    def scope_key(self) -> str:
+        """Identifies the search scope, so answers are only reused within the same scope."""
+        return json.dumps([self.namespace, self.filter], sort_keys=True)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so that case and spacing differences still match."""
+        return re.sub(r'\s+', ' ', query).strip().casefold()
+
+    def get(self, query: str, top_k: int) -> Optional[Dict[str, Any]]:
+        """
+        Return stored results for a query if at least top_k results were fetched.
+
+        Args:
+            query: Search query
+            top_k: Number of results wanted
+
+        Returns:
+            Search result dictionary trimmed to top_k, or None on a miss
+        """
+        with self._lock:
+            entry = self._results.get(self.normalize(query))
+            if entry is None or entry[0] < top_k:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        fetched_k, result = entry
+        if fetched_k == top_k:
+            return result
+
+        results = result["results"][:top_k]
+        return {**result, "results": results, "sources": collect_sources(results)}
+
+    def put(self, query: str, top_k: int, result: Dict[str, Any]) -> None:
+        """
+        Store search results for a query.
+
+        Args:
+            query: Search query
+            top_k: Number of results that were requested
+            result: Search result dictionary from search_with_metadata
+        """
+        key = self.normalize(query)
+        with self._lock:
+            existing = self._results.get(key)
+            if existing is None or existing[0] < top_k:
+                self._results[key] = (top_k, result)
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        """
+        Return the embedding of a query already embedded during the request.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Query embedding, or None if the query was not embedded yet
+        """
+        with self._lock:
+            return self._embeddings.get(self.normalize(query))
+
+    def put_embedding(self, query: str, embedding: List[float]) -> None:
+        """
+        Store the embedding of a query, so searching it does not embed it again.
+
+        Args:
+            query: Search query
+            embedding: Query embedding
+        """
+        with self._lock:
+            self._embeddings[self.normalize(query)] = embedding
+
+
+_current_context: ContextVar[Optional[RetrievalContext]] = ContextVar(
+    "retrieval_context", default=None
+)
+
+
+def get_retrieval_context() -> Optional[RetrievalContext]:
+    """Get the retrieval context of the current request, if any."""
+    return _current_context.get()
+
+
+@contextmanager
+def retrieval_scope(namespace: str = "", filter: Optional[Dict[str, Any]] = None) -> Iterator[RetrievalContext]:
+    """
+    Open a retrieval context for the duration of a request.
+
+    Args:
+        namespace: Namespace every search inside the scope is restricted to
+        filter: Metadata filter every search inside the scope is restricted to
+
+    Yields:
+        The RetrievalContext shared by every search made inside the scope
+    """
+    context = RetrievalContext(namespace, filter)
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        try:
+            _current_context.reset(token)
+        except ValueError:
+            # Streaming generators may be closed from another context on disconnect
+            _current_context.set(None)
@@ -0,0 +1,109 @@
+"""
+Process-wide TTL cache of web search results.
+
+The agent often repeats the same web query within and across requests, so
+formatted results are kept per (provider, normalized query, options) for
+WEB_SEARCH_CACHE_TTL_SECONDS, evicting the least recently used entries beyond
+WEB_SEARCH_CACHE_MAX_ENTRIES.
+"""
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class WebSearchCache:
+    """In-memory TTL/LRU cache of formatted web search results."""
+
+    _instance: Optional['WebSearchCache'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Initialize the cache with environment variables.
+
+        Args:
+            ttl_seconds: Entry lifetime (defaults to WEB_SEARCH_CACHE_TTL_SECONDS)
+            max_entries: Maximum entries before LRU eviction (defaults to WEB_SEARCH_CACHE_MAX_ENTRIES)
+        """
+        self.ttl_seconds = ttl_seconds or float(os.getenv("WEB_SEARCH_CACHE_TTL_SECONDS", "900"))
+        self.max_entries = max_entries or int(os.getenv("WEB_SEARCH_CACHE_MAX_ENTRIES", "512"))
+
+        self._entries: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get_instance(cls) -> 'WebSearchCache':
+        """Get singleton instance of WebSearchCache."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so that case and spacing differences still match."""
+        return re.sub(r'\s+', ' ', query).strip().casefold()
+
+    def get(self, provider: str, query: str, *options: Hashable) -> Optional[str]:
+        """
+        Look up cached results.
+
+        Args:
+            provider: Search provider name
+            query: Search query
+            *options: Other arguments that change the results (e.g. max_results)
+
+        Returns:
+            Formatted results, or None on a miss
+        """
+        key = (provider, self.normalize(query), *options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, provider: str, query: str, *options: Hashable, value: str) -> None:
+        """
+        Cache formatted results.
+
+        Args:
+            provider: Search provider name
+            query: Search query
+            *options: Other arguments that change the results
+            value: Formatted results
+        """
+        key = (provider, self.normalize(query), *options)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the current number of entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+# Convenience function to get cache instance
+def get_web_search_cache() -> WebSearchCache:
+    """Get singleton instance of WebSearchCache."""
+    return WebSearchCache.get_instance()
@@ -0,0 +1,205 @@
+"""
+Parallel fetching and text extraction of web search result pages.
+
+With WEB_SEARCH_FETCH_PAGES=true the web search tool fetches the top
+WEB_SEARCH_FETCH_TOP_N result pages concurrently on a shared thread pool, so
+downloads and HTML parsing never run on the event loop. Pages that have not
+been fetched and parsed within WEB_SEARCH_FETCH_BUDGET_SECONDS in total are
+skipped. Each page is reduced to the paragraphs that best match the query,
+up to WEB_SEARCH_EXCERPT_CHARS characters.
+
+Only HTML pages on public addresses are fetched: result URLs (and redirects)
+pointing at loopback, private or link-local hosts such as cloud metadata
+endpoints are refused, and at most WEB_SEARCH_FETCH_MAX_BYTES of each page
+is read.
+"""
+
+import os
+import re
+import time
+import socket
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from backend.clients.http_client import get_http_client
+from backend.clients.sparse_encoder import BM25Encoder
+
+_BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg"]
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_MAX_REDIRECTS = 5
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def page_fetch_enabled() -> bool:
+    """Whether web search results include fetched page excerpts (WEB_SEARCH_FETCH_PAGES)."""
+    return os.getenv("WEB_SEARCH_FETCH_PAGES", "false").lower() == "true"
+
+
+def get_fetch_pool() -> ThreadPoolExecutor:
+    """Get the shared page fetch pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=int(os.getenv("WEB_SEARCH_FETCH_WORKERS", "8")),
+                thread_name_prefix="web-fetch"
+            )
+        return _pool
+
+
+def resolve_result_url(href: str) -> str:
+    """
+    Turn a DuckDuckGo result link into the target URL.
+
+    Args:
+        href: Link from the results page (may be a //duckduckgo.com/l/?uddg=... redirect)
+
+    Returns:
+        Absolute target URL
+    """
+    if href.startswith("//"):
+        href = "https:" + href
+    parts = urlsplit(href)
+    if parts.netloc.endswith("duckduckgo.com") and parts.path.startswith("/l/"):
+        target = parse_qs(parts.query).get("uddg")
+        if target:
+            return target[0]
+    return href
+
+
+def is_public_url(url: str) -> bool:
+    """
+    Whether a URL is http(s) and its host only resolves to public addresses.
+
+    Args:
+        url: URL to check
+
+    Returns:
+        False for other schemes, unresolvable hosts, and hosts with any
+        loopback, private, link-local or otherwise non-global address
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError):
+        return False
+    for _, _, _, _, sockaddr in addresses:
+        # IPv6 addresses may carry a zone index ("fe80::1%eth0")
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            return False
+    return True
+
+
+def extract_excerpt(query: str, html: str, max_chars: int) -> str:
+    """
+    Extract the paragraphs of a page that best match a query.
+
+    Args:
+        query: Search query
+        html: Page HTML
+        max_chars: Maximum excerpt length
+
+    Returns:
+        Matching paragraphs in page order, joined by blank lines
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+
+    paragraphs = []
+    for element in soup.find_all(["p", "li", "h1", "h2", "h3", "td", "pre"]):
+        text = _WHITESPACE_PATTERN.sub(' ', element.get_text(" ")).strip()
+        if len(text) >= 40:
+            paragraphs.append(text)
+    if not paragraphs:
+        text = _WHITESPACE_PATTERN.sub(' ', soup.get_text(" ")).strip()
+        return text[:max_chars]
+
+    query_terms = set(BM25Encoder.tokenize(query))
+    scored = [
+        (len(query_terms.intersection(BM25Encoder.tokenize(paragraph))), index)
+        for index, paragraph in enumerate(paragraphs)
+    ]
+    # Best matching paragraphs first (earlier ones win ties), then restored to page order
+    selected: List[int] = []
+    length = 0
+    for _, index in sorted(scored, key=lambda item: (-item[0], item[1])):
+        if length + len(paragraphs[index]) > max_chars and selected:
+            continue
+        selected.append(index)
+        length += len(paragraphs[index]) + 2
+        if length >= max_chars:
+            break
+
+    return "\n\n".join(paragraphs[index] for index in sorted(selected))[:max_chars]
+
+
+def fetch_excerpts(query: str, urls: List[str]) -> Dict[str, str]:
+    """
+    Fetch pages concurrently and extract query-relevant excerpts within a time budget.
+
+    Args:
+        query: Search query
+        urls: Page URLs to fetch
+
+    Returns:
+        Mapping of URL to excerpt for the pages that finished in time
+    """
+    budget = float(os.getenv("WEB_SEARCH_FETCH_BUDGET_SECONDS", "5"))
+    max_chars = int(os.getenv("WEB_SEARCH_EXCERPT_CHARS", "1500"))
+    max_bytes = int(os.getenv("WEB_SEARCH_FETCH_MAX_BYTES", "2000000"))
+    http_client = get_http_client()
+    deadline = time.monotonic() + budget
+
+    def fetch(url: str) -> Optional[str]:
+        # Running fetches cannot be cancelled, so each one stops at the deadline
+        # by itself (without retries) instead of holding a worker past it.
+        # Redirects are followed here so every hop gets the address check
+        for _ in range(_MAX_REDIRECTS + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not is_public_url(url):
+                return None
+            with http_client.stream(
+                "GET", url, timeout=remaining, follow_redirects=False, headers={"User-Agent": "Mozilla/5.0"}
+            ) as response:
+                if response.next_request is not None:
+                    url = str(response.next_request.url)
+                    continue
+                if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+                    return None
+                body = bytearray()
+                for data in response.iter_bytes():
+                    body += data
+                    if len(body) >= max_bytes or time.monotonic() >= deadline:
+                        break
+                html = body[:max_bytes].decode(response.charset_encoding or "utf-8", errors="replace")
+            return extract_excerpt(query, html, max_chars)
+        return None
+
+    pool = get_fetch_pool()
+    futures = {pool.submit(fetch, url): url for url in urls}
+    done, not_done = wait(futures, timeout=budget)
+    for future in not_done:
+        future.cancel()
+
+    excerpts = {}
+    for future in done:
+        try:
+            excerpt = future.result()
+        except Exception as e:
+            print(f"Warning: Could not fetch {futures[future]}: {e}")
+            continue
+        if excerpt:
+            excerpts[futures[future]] = excerpt
+    return excerpts
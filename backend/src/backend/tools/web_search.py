@@ -3,12 +3,26 @@ Web Search Tool for CrewAI using DuckDuckGo search.
 
 This tool provides web search capabilities without requiring an API key.
 DuckDuckGo is used as it's free and doesn't require authentication.
+Successful results are cached per normalized query (see web_cache), and with
+WEB_SEARCH_FETCH_PAGES=true the top result pages are fetched in parallel and
+summarized into excerpts (see web_fetch).
 """
 
-from typing import Optional
+import os
+from typing import List, Tuple
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-import requests
+
+from backend.clients.http_client import get_http_client
+from backend.metrics import get_metrics
+from backend.tools.retrieval_context import get_retrieval_context
+from backend.tools.web_cache import get_web_search_cache
+from backend.tools.web_fetch import fetch_excerpts, page_fetch_enabled, resolve_result_url
+
+DUCKDUCKGO_URL = "https://html.duckduckgo.com/html/"
+DUCKDUCKGO_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
 
 
 class WebSearchInput(BaseModel):
@@ -39,86 +53,88 @@ class WebSearchTool(BaseTool):
         Returns:
             Formatted string with search results including URLs
         """
+        _mark_web_search()
+        fetch_pages = page_fetch_enabled()
+        cache = get_web_search_cache()
+        cached = cache.get(self.name, query, max_results, fetch_pages)
+        if cached is not None:
+            return cached
+
+        with get_metrics().timed("web_search"):
+            results_text, found = self._search(query, max_results, fetch_pages)
+        if found:
+            cache.put(self.name, query, max_results, fetch_pages, value=results_text)
+        return results_text
+
+    def _search(self, query: str, max_results: int, fetch_pages: bool) -> Tuple[str, bool]:
+        """
+        Query DuckDuckGo and format the results.
+
+        Returns:
+            (formatted results or error message, whether results were found)
+        """
         try:
-            from bs4 import BeautifulSoup
+            # Use DuckDuckGo HTML API (no API key required) over the shared pooled client
+            response = get_http_client().post(
+                DUCKDUCKGO_URL, data={"q": query}, headers=DUCKDUCKGO_HEADERS, timeout=10
+            )
+        except Exception as e:
+            return f"Error performing web search: {str(e)}. Unable to retrieve web information at this time.", False
 
-            # Use DuckDuckGo HTML API (no API key required)
-            url = "https://html.duckduckgo.com/html/"
-            params = {"q": query}
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
+        if response.status_code != 200:
+            return f"Web search failed with status code: {response.status_code}", False
 
-            response = requests.post(url, data=params, headers=headers, timeout=10)
+        try:
+            from bs4 import BeautifulSoup
+        except ImportError:
+            # Fallback if BeautifulSoup is not available, parsing the same response
+            return self._parse_fallback(query, response.text, max_results)
 
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                results_text = []
+        try:
+            soup = BeautifulSoup(response.text, 'html.parser')
+            results = []
 
-                # Find all result divs
-                result_divs = soup.find_all('div', class_='result__body')
+            # Find all result divs
+            result_divs = soup.find_all('div', class_='result__body')
 
-                for i, result_div in enumerate(result_divs[:max_results], 1):
-                    # Extract title and URL
-                    title_link = result_div.find('a', class_='result__a')
-                    snippet_elem = result_div.find('a', class_='result__snippet')
+            for result_div in result_divs[:max_results]:
+                # Extract title and URL
+                title_link = result_div.find('a', class_='result__a')
+                snippet_elem = result_div.find('a', class_='result__snippet')
 
-                    if title_link:
-                        title = title_link.get_text(strip=True)
-                        result_url = title_link.get('href', '')
-                        snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
+                if title_link:
+                    results.append((
+                        title_link.get_text(strip=True),
+                        resolve_result_url(title_link.get('href', '')),
+                        snippet_elem.get_text(strip=True) if snippet_elem else ""
+                    ))
 
-                        # Format with URL
-                        result_text = f"[Result {i}]\nTitle: {title}\nURL: {result_url}\nSnippet: {snippet}"
-                        results_text.append(result_text)
+            if not results:
+                return f"Web search completed for '{query}' but no clear results were extracted. " \
+                       f"Consider rephrasing the question or noting that current information may be limited.", False
 
-                if results_text:
-                    return "\n\n".join(results_text)
-                else:
-                    return f"Web search completed for '{query}' but no clear results were extracted. " \
-                           f"Consider rephrasing the question or noting that current information may be limited."
-            else:
-                return f"Web search failed with status code: {response.status_code}"
+            return _format_results(query, results, fetch_pages), True
 
-        except ImportError:
-            # Fallback if BeautifulSoup is not available
-            return self._run_fallback(query, max_results)
         except Exception as e:
-            return f"Error performing web search: {str(e)}. Unable to retrieve web information at this time."
+            return f"Error performing web search: {str(e)}. Unable to retrieve web information at this time.", False
 
-    def _run_fallback(self, query: str, max_results: int = 5) -> str:
-        """Fallback method without BeautifulSoup."""
-        try:
-            url = "https://html.duckduckgo.com/html/"
-            params = {"q": query}
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
+    def _parse_fallback(self, query: str, content: str, max_results: int = 5) -> Tuple[str, bool]:
+        """Fallback parser for the DuckDuckGo HTML without BeautifulSoup."""
+        results_text = []
+        snippets = content.split('result__snippet')
 
-            response = requests.post(url, data=params, headers=headers, timeout=10)
+        for i, snippet in enumerate(snippets[1:max_results+1], 1):
+            text_start = snippet.find('>') + 1
+            text_end = snippet.find('</a>', text_start)
+            if text_start > 0 and text_end > 0:
+                result_text = snippet[text_start:text_end].strip()
+                if result_text:
+                    results_text.append(f"[Result {i}] {result_text}")
 
-            if response.status_code == 200:
-                results_text = []
-                content = response.text
-                snippets = content.split('result__snippet')
-
-                for i, snippet in enumerate(snippets[1:max_results+1], 1):
-                    try:
-                        text_start = snippet.find('>') + 1
-                        text_end = snippet.find('</a>', text_start)
-                        if text_start > 0 and text_end > 0:
-                            result_text = snippet[text_start:text_end].strip()
-                            if result_text:
-                                results_text.append(f"[Result {i}] {result_text}")
-                    except:
-                        continue
-
-                if results_text:
-                    return "\n\n".join(results_text)
-
-            return f"Web search completed for '{query}' but no results found."
-        except Exception as e:
-            return f"Error performing web search: {str(e)}"
+        if results_text:
+            return "\n\n".join(results_text), True
+
+        return f"Web search completed for '{query}' but no results found.", False
 
 
 # Alternative: If you have a Serper API key, you can use this implementation instead
@@ -137,12 +153,17 @@ class SerperWebSearchTool(BaseTool):
 
     def _run(self, query: str, max_results: int = 5) -> str:
         """Search the web using Serper API."""
-        import os
-
         api_key = os.getenv("SERPER_API_KEY")
         if not api_key:
             return "Serper API key not configured. Unable to perform web search."
 
+        _mark_web_search()
+        fetch_pages = page_fetch_enabled()
+        cache = get_web_search_cache()
+        cached = cache.get(self.name, query, max_results, fetch_pages)
+        if cached is not None:
+            return cached
+
         try:
             url = "https://google.serper.dev/search"
             headers = {
@@ -154,20 +175,22 @@ class SerperWebSearchTool(BaseTool):
                 "num": max_results
             }
 
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            with get_metrics().timed("web_search"):
+                response = get_http_client().post(url, json=payload, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
                 results = data.get("organic", [])
 
-                formatted_results = []
-                for i, result in enumerate(results[:max_results], 1):
-                    title = result.get("title", "")
-                    snippet = result.get("snippet", "")
-                    formatted_results.append(f"[Result {i}] {title}\n{snippet}")
+                formatted_results = [
+                    (result.get("title", ""), result.get("link", ""), result.get("snippet", ""))
+                    for result in results[:max_results]
+                ]
 
                 if formatted_results:
-                    return "\n\n".join(formatted_results)
+                    results_text = _format_results(query, formatted_results, fetch_pages)
+                    cache.put(self.name, query, max_results, fetch_pages, value=results_text)
+                    return results_text
                 else:
                     return "No results found for the query."
             else:
@@ -175,3 +198,36 @@ class SerperWebSearchTool(BaseTool):
 
         except Exception as e:
             return f"Error using Serper API: {str(e)}"
+
+
+def _mark_web_search() -> None:
+    """Record on the request's retrieval context that its answer draws on the web."""
+    context = get_retrieval_context()
+    if context is not None:
+        context.used_web_search = True
+
+
+def _format_results(query: str, results: List[Tuple[str, str, str]], fetch_pages: bool) -> str:
+    """
+    Format (title, URL, snippet) results, adding page excerpts when fetch_pages is set.
+
+    Args:
+        query: Search query
+        results: Search results in rank order
+        fetch_pages: Fetch the top WEB_SEARCH_FETCH_TOP_N pages and include excerpts
+
+    Returns:
+        Formatted results
+    """
+    excerpts = {}
+    if fetch_pages:
+        top_n = int(os.getenv("WEB_SEARCH_FETCH_TOP_N", "3"))
+        excerpts = fetch_excerpts(query, [url for _, url, _ in results[:top_n] if url.startswith("http")])
+
+    formatted = []
+    for i, (title, url, snippet) in enumerate(results, 1):
+        result_text = f"[Result {i}]\nTitle: {title}\nURL: {url}\nSnippet: {snippet}"
+        if url in excerpts:
+            result_text += f"\nExcerpt: {excerpts[url]}"
+        formatted.append(result_text)
+    return "\n\n".join(formatted)